@@ -0,0 +1,101 @@
+"""
+Compare feedback from the full video against feedback from keyframes plus audio.
+
+For each keyframe mode the sampler is timed on its own, reporting how many frames
+it picks and their size. Unless --sampler-only is given, both feedback requests
+are then run end to end against the Gemini API, and the prompt tokens each one
+costs are counted. Needs GEMINI_API_KEY, and ffmpeg for the audio track.
+
+Usage:
+    python benchmarks/keyframe_feedback.py RECORDING [--runs N] [--job TEXT] [--sampler-only]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+sys.path.insert(0, SRC_DIR)
+
+from gemini_service import (  # noqa: E402
+    get_interview_feedback_from_gemini,
+    get_keyframe_feedback_from_gemini,
+    upload_interview_video,
+)
+from keyframes import sample_keyframes, pack_keyframes  # noqa: E402
+from providers import get_provider  # noqa: E402
+from video_proxy import extract_audio_track  # noqa: E402
+
+KEYFRAME_MODES = ['motion', 'interval']
+
+
+def median_seconds(fn, runs):
+    """Return the median seconds fn takes over several runs, and its last result."""
+    timings = []
+    result = None
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings), result
+
+
+def full_video_tokens(recording):
+    """Return the prompt tokens of the recording uploaded as a video."""
+    video_file = upload_interview_video(recording)
+    return get_provider('gemini_model').count_tokens([video_file]).total_tokens
+
+
+def keyframe_tokens(recording, keyframes):
+    """Return the prompt tokens of the recording's audio track plus its keyframes."""
+    audio_file = upload_interview_video(extract_audio_track(recording), mime_type='audio/aac')
+    return get_provider('gemini_model').count_tokens([audio_file, *pack_keyframes(keyframes)]).total_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('recording', help='path of an interview recording')
+    parser.add_argument('--runs', type=int, default=3, help='number of runs per case')
+    parser.add_argument('--job', default='Software Engineer', help='job description used in the feedback prompt')
+    parser.add_argument('--sampler-only', action='store_true', help='only time the keyframe sampler')
+    args = parser.parse_args()
+
+    keyframes = {}
+    for mode in KEYFRAME_MODES:
+        seconds, keyframes[mode] = median_seconds(lambda: sample_keyframes(args.recording, mode=mode), args.runs)
+        size = sum(len(image) for _, image in keyframes[mode])
+        print(f"sample {mode:<9} median {seconds * 1000:8.1f} ms, "
+              f"{len(keyframes[mode])} frames, {size / 1024:.0f} KiB")
+
+    if args.sampler_only:
+        return
+
+    cases = {
+        'full video': (
+            lambda: get_interview_feedback_from_gemini(args.job, args.recording),
+            lambda: full_video_tokens(args.recording),
+        ),
+    }
+    for mode in KEYFRAME_MODES:
+        cases[f'keyframes ({mode}) + audio'] = (
+            lambda mode=mode: get_keyframe_feedback_from_gemini(args.job, args.recording,
+                                                                keyframes=keyframes[mode]),
+            lambda mode=mode: keyframe_tokens(args.recording, keyframes[mode]),
+        )
+
+    results = {}
+    for name, (request_feedback, count_tokens) in cases.items():
+        seconds, _ = median_seconds(request_feedback, args.runs)
+        results[name] = (seconds, count_tokens())
+        print(f"{name:<26} median {seconds:7.1f} s end to end, {results[name][1]:7d} prompt tokens")
+
+    full_seconds, full_tokens = results['full video']
+    for name, (seconds, tokens) in results.items():
+        if name != 'full video':
+            print(f"{name}: {(1 - seconds / full_seconds) * 100:.0f}% faster, "
+                  f"{(1 - tokens / full_tokens) * 100:.0f}% fewer tokens than the full video")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Measure how long it takes to import the web app.
+
+Each measurement runs in a fresh interpreter from a src directory. The current
+tree is always measured. With --baseline, the src directory of that git revision
+is exported to a temporary directory and measured the same way, for example the
+commit before the Gemini and Scrapfly clients were built on first use.
+
+Usage:
+    python benchmarks/startup_time.py [--runs N] [--baseline REV]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+SRC_DIR = os.path.join(REPO_DIR, 'src')
+
+
+def export_src(revision, directory):
+    """Write the src directory of a git revision into directory and return its path."""
+    archive_path = os.path.join(directory, 'src.tar')
+    subprocess.run(['git', 'archive', '--output', archive_path, revision, 'src'], cwd=REPO_DIR, check=True)
+    with tarfile.open(archive_path) as archive:
+        archive.extractall(directory)
+    return os.path.join(directory, 'src')
+
+
+def time_import(src_dir, statement="import app"):
+    """Return the seconds a fresh interpreter takes to run an import statement from src_dir."""
+    code = (
+        "import time\n"
+        "started_at = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - started_at)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=src_dir, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def median_import_seconds(src_dir, runs):
+    """Return the median seconds importing app takes over several fresh interpreters."""
+    return statistics.median(time_import(src_dir) for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='number of fresh interpreters per case')
+    parser.add_argument('--baseline', help='git revision to compare the current tree against')
+    args = parser.parse_args()
+
+    current = median_import_seconds(SRC_DIR, args.runs)
+    print(f"{'current tree':<28} median {current * 1000:8.1f} ms over {args.runs} runs")
+    if not args.baseline:
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = median_import_seconds(export_src(args.baseline, directory), args.runs)
+    print(f"{args.baseline:<28} median {baseline * 1000:8.1f} ms over {args.runs} runs")
+    print(f"Import time saved: {(baseline - current) * 1000:.1f} ms ({(1 - current / baseline) * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
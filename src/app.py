@@ -1,28 +1,66 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, copy_current_request_context
+from dotenv import load_dotenv
+
+# Load .env before importing the modules below, some of them read their settings at import time
+load_dotenv()
+
+from flask import Flask, Response, render_template, request, redirect, url_for, session, jsonify  # noqa: E402
+import json
 import os
-import base64
+import atexit
 import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from gemini_service import (
-    get_questions_from_gemini,
+    get_intro_and_questions_from_gemini,
     get_intro_script_from_gemini,
-    get_interview_feedback_from_gemini
+    stream_questions_from_gemini,
+    get_interview_feedback_from_gemini,
+    get_segmented_feedback_from_gemini,
+    get_transcript_feedback_from_gemini,
+    get_keyframe_feedback_from_gemini
 )
 from detect_link import detect_link
-from generate_avatar import generate_video
+import generate_avatar
+from generate_avatar import ClipRenderer, notify_clip_finished
+import jobs
+from session_storage import session_dir, start_session_gc
+from result_store import create_result_store
+from question_bank import serve_bank_clips
+from video_proxy import answer_segments, can_split_recording
+from transcribe import transcribe_recording, transcription_enabled
+from keyframes import sample_keyframes, keyframe_feedback_enabled
+from worker_pool import WorkerPool, QueueFullError
 
 # Initialize Flask app and set configurations
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['AVATAR_FOLDER'] = 'static/videos'
+app.config['SESSION_VIDEO_FOLDER'] = 'static/videos/sessions'
+app.config['RENDER_WORKERS'] = 4
+app.config['PIPELINED_GENERATION'] = os.getenv('PIPELINED_GENERATION') == '1'
+app.config['FEEDBACK_WORKERS'] = 4
+app.config['FEEDBACK_QUEUE_SIZE'] = 16
+app.config['FEEDBACK_STREAM_TIMEOUT'] = 30 * 60
+app.config['STRUCTURED_FEEDBACK'] = os.getenv('STRUCTURED_FEEDBACK') == '1'
 app.secret_key = 'your_secret_key'
 
 # Ensure the upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-# Global cache for feedback
-feedback_cache = {}
+# Remove the files of expired sessions in the background
+start_session_gc([app.config['SESSION_VIDEO_FOLDER'], app.config['UPLOAD_FOLDER']])
+
+# Interviews, jobs and feedback results shared by every worker process
+result_store = create_result_store(
+    os.getenv('RESULT_STORE_URL', 'sqlite:///' + os.path.join(app.instance_path, 'results.db'))
+)
+jobs.use_store(result_store)
+generate_avatar.use_store(result_store)
+
+# Feedback jobs run on a fixed-size pool that drains its queue on shutdown
+feedback_pool = WorkerPool(app.config['FEEDBACK_WORKERS'], app.config['FEEDBACK_QUEUE_SIZE'])
+atexit.register(feedback_pool.shutdown)
 
 
 @app.route('/')
@@ -33,12 +71,30 @@ def index():
 
 @app.route('/generate-questions', methods=['POST'])
 def generate_questions():
-    """Generate questions based on the job description and other inputs."""
+    """Start a background job that prepares the interview and show the loading screen."""
     job_description = request.form['job_description']
     num_questions = int(request.form['num_questions'])
     avatar = request.form['avatar']
     complexity = request.form['complexity']
+    fresh = request.form.get('fresh_questions') == 'on'
+
+    # Every interview gets its own folders so concurrent sessions never share files
+    session_id = str(uuid.uuid4())
+
+    job_id = jobs.create_job()
+    jobs.start_job(job_id, prepare_interview, session_id, job_description, num_questions, avatar, complexity, fresh)
+
+    # Store data in session
+    session['session_id'] = session_id
+    session['job_id'] = job_id
+    session['feedback_id'] = str(uuid.uuid4())
+
+    return redirect(url_for('loading_screen'))
 
+
+def prepare_interview(job_id, session_id, job_description, num_questions, avatar, complexity, fresh=False):
+    """Scrape the job posting, generate the scripts and render the videos for a job."""
+    jobs.update_job(job_id, state=jobs.SCRAPING, message='Reading the job description...')
     job_description = detect_link(job_description)
 
     # Truncate the job description if it exceeds the max length
@@ -46,25 +102,171 @@ def generate_questions():
     if len(job_description) > max_length:
         job_description = job_description[:max_length].rstrip() + '...'
 
-    # Fetch intro script and questions from the Gemini service
-    intro_script = get_intro_script_from_gemini(job_description, num_questions, avatar)
-    generated_questions = get_questions_from_gemini(job_description, num_questions, complexity, avatar)
+    # The interview is published to the result store as it takes shape, so every worker can read it
+    interview = {'questions': [], 'intro_script': None, 'job_description': job_description}
+    interview_lock = threading.Lock()
+
+    def publish_interview(**fields):
+        with interview_lock:
+            interview.update(fields)
+            result_store.set(f"interview:{session_id}", interview)
+
+    # Track rendering progress: the intro plus one clip per question
+    video_folder = session_dir(app.config['SESSION_VIDEO_FOLDER'], session_id)
+    clips_total = num_questions + 1
+    clips_done = 0
+    clips_lock = threading.Lock()
+
+    def on_clip_complete(video_name, video_path):
+        nonlocal clips_done
+        with clips_lock:
+            clips_done += 1
+            message = f'Rendering clip {min(clips_done + 1, clips_total)} of {clips_total}...'
+            jobs.update_job(job_id, clips_done=clips_done, message=message)
+
+    renderer = ClipRenderer(avatar, max_workers=app.config['RENDER_WORKERS'],
+                            on_complete=on_clip_complete, output_dir=video_folder)
+
+    def render_clip(input_text, video_name):
+        jobs.update_job(job_id, state=jobs.RENDERING)
+
+        # Common questions are served from the pre-rendered bank, only the rest are rendered live
+        clips, served = serve_bank_clips([(input_text, video_name)], avatar, complexity, video_folder)
+        if served:
+            on_clip_complete(video_name, os.path.join(video_folder, video_name))
+        else:
+            renderer.submit(input_text, video_name)
+
+    jobs.update_job(job_id, state=jobs.SCRIPTING, clips_total=clips_total, message='Preparing your questions...')
+    try:
+        if app.config['PIPELINED_GENERATION']:
+            generate_interview_pipelined(publish_interview, render_clip, job_description, num_questions,
+                                         avatar, complexity, fresh, video_folder)
+        else:
+            # Fetch intro script and questions from the Gemini service
+            intro_script, generated_questions = get_intro_and_questions_from_gemini(
+                job_description, num_questions, complexity, avatar, fresh
+            )
+            for idx, question in enumerate(generated_questions, start=1):
+                question['video_path'] = os.path.join(video_folder, f'question_video_{idx}.mp4')
+            publish_interview(intro_script=intro_script, questions=generated_questions)
+
+            # Render the intro and question videos concurrently into the session's folder
+            render_clip(intro_script, 'intro.mp4')
+            for idx, question in enumerate(generated_questions, start=1):
+                render_clip(question['question'], f'question_video_{idx}.mp4')
+    finally:
+        renderer.wait()
+
+    jobs.update_job(job_id, state=jobs.DONE, message='Your interviewer is ready.')
+
+
+def generate_interview_pipelined(publish_interview, render_clip, job_description, num_questions,
+                                 avatar, complexity, fresh, video_folder):
+    """
+    Write and render the interview as a pipeline instead of one step after the other.
+
+    The intro script is rendered as soon as Gemini returns it, and each question is
+    rendered as soon as its line arrives on the streamed questions response, while
+    the later questions are still being written.
+    """
+    def prepare_intro():
+        intro_script = get_intro_script_from_gemini(job_description, num_questions, avatar, fresh)
+        publish_interview(intro_script=intro_script)
+        render_clip(intro_script, 'intro.mp4')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        intro_future = executor.submit(prepare_intro)
+
+        questions = []
+        for idx, question_text in enumerate(
+            stream_questions_from_gemini(job_description, num_questions, complexity, fresh), start=1
+        ):
+            video_name = f'question_video_{idx}.mp4'
+            questions.append({'question': question_text, 'video_path': os.path.join(video_folder, video_name)})
+            publish_interview(questions=list(questions))
+            render_clip(question_text, video_name)
+
+        # Wait for the intro to be written and submitted before the job moves on
+        intro_future.result()
+
+
+def get_session_video_path(video_name):
+    """Return the path of a video in the current session's video folder."""
+    return os.path.join(app.config['SESSION_VIDEO_FOLDER'], session.get('session_id', ''), video_name)
+
+
+def get_session_upload_path(file_name):
+    """Return the path of a file in the current session's upload folder, creating the folder if needed."""
+    upload_folder = session_dir(app.config['UPLOAD_FOLDER'], session.get('session_id', 'anonymous'))
+    return os.path.join(upload_folder, file_name)
+
+
+def get_session_job_result():
+    """Return the interview prepared for the current session, or an empty dict."""
+    return result_store.get(f"interview:{session.get('session_id')}") or {}
+
+
+def get_session_questions():
+    """Return the current session's questions, each flagged with whether its clip is ready to play."""
+    questions = get_session_job_result().get('questions', [])
+    return [
+        dict(question, ready=os.path.exists(question['video_path']))
+        for question in questions
+        if isinstance(question, dict) and 'video_path' in question
+    ]
 
-    # Generate the intro video using the intro_script
-    generate_video(intro_script, 'intro.mp4', avatar)
 
-    # Generate videos for each question
-    for idx, question in enumerate(generated_questions, start=1):
-        video_name = f'question_video_{idx}.mp4'
-        generate_video(question['question'], video_name, avatar)
+def is_interview_ready():
+    """Return True once the intro and the first question of the current session can be played."""
+    questions = get_session_questions()
+    return os.path.exists(get_session_video_path('intro.mp4')) and bool(questions) and questions[0]['ready']
+
+
+@app.route('/job-status')
+def job_status():
+    """Report the progress of the interview job stored in the session."""
+    job = jobs.get_job(session.get('job_id'))
+    if not job:
+        return jsonify({'state': jobs.FAILED, 'message': 'No interview is being prepared.'}), 404
+
+    return jsonify({
+        'state': job['state'],
+        'message': job['message'],
+        'clips_done': job['clips_done'],
+        'clips_total': job['clips_total'],
+        'interview_ready': job['state'] != jobs.FAILED and is_interview_ready(),
+    })
+
+
+@app.route('/question-status')
+def question_status():
+    """Report which of the current session's question clips are ready, so the recording page can enable them."""
+    job = jobs.get_job(session.get('job_id'))
+    state = job['state'] if job else jobs.FAILED
+
+    # Clips still missing once the job has finished will never arrive
+    finished = state in (jobs.DONE, jobs.FAILED)
+    questions = [
+        {
+            'question': question['question'],
+            'video_url': '/' + question['video_path'],
+            'ready': question['ready'],
+            'failed': finished and not question['ready'],
+        }
+        for question in get_session_questions()
+    ]
+    return jsonify({'state': state, 'questions': questions})
 
-    # Store data in session
-    session['questions'] = generated_questions
-    session['intro_script'] = intro_script
-    session['job_description'] = job_description
-    session['feedback_id'] = str(uuid.uuid4())
 
-    return redirect(url_for('loading_screen'))
+@app.route('/did-webhook', methods=['POST'])
+def did_webhook():
+    """Receive D-ID's clip completion webhook and wake the render waiting on the clip, in any worker."""
+    status_data = request.get_json(silent=True) or {}
+    if not notify_clip_finished(status_data.get('id')):
+        return jsonify({'error': 'Missing clip ID.'}), 400
+
+    return jsonify({'received': True})
 
 
 @app.route('/loading')
@@ -76,80 +278,220 @@ def loading_screen():
 @app.route('/intro')
 def intro_page():
     """Display the intro script."""
-    intro_script = session.get('intro_script', "No introduction script available.")
-    return render_template('intro.html', intro_script=intro_script)
+    intro_script = get_session_job_result().get('intro_script', "No introduction script available.")
+    intro_video = '/' + get_session_video_path('intro.mp4')
+    return render_template('intro.html', intro_script=intro_script, intro_video=intro_video)
 
 
 @app.route('/check-intro-file')
 def check_intro_file():
     """Check if the intro video file exists."""
-    intro_file_path = os.path.join(app.config['AVATAR_FOLDER'], 'intro.mp4')
+    intro_file_path = get_session_video_path('intro.mp4')
     file_exists = os.path.exists(intro_file_path)
     return jsonify({'exists': file_exists})
 
 
 @app.route('/start-recording')
 def start_recording():
-    """Render the recording page with the list of questions."""
-    questions = session.get('questions', [])
-    print(f"Questions retrieved: {questions}")
+    """
+    Render the recording page with the list of questions.
 
-    valid_questions = [
-        question for question in questions
-        if isinstance(question, dict) and 'video_path' in question and os.path.exists(question['video_path'])
-    ]
+    Only the first question has to be ready. The page enables the others as
+    their clips finish rendering.
+    """
+    questions = get_session_questions()
+    print(f"Questions retrieved: {questions}")
 
-    if not valid_questions:
+    if not questions or not questions[0]['ready']:
         print("No valid questions were retrieved.")
         return render_template('error.html', message="No valid questions available. Please try again.")
 
-    return render_template('record.html', questions=valid_questions)
+    return render_template('record.html', questions=questions)
+
+
+@app.route('/upload-chunk', methods=['POST'])
+def upload_chunk():
+    """
+    Append one chunk of the recording, sent as raw binary while recording, to the session's upload file.
+
+    Chunks must arrive in order. A chunk that was already written, such as a
+    retry whose response was lost, is acknowledged without being written again.
+    A chunk that skips ahead is rejected with 409 and the index that was expected.
+    """
+    chunk_index = request.args.get('index', type=int)
+    recording_id = request.args.get('recording')
+    if chunk_index is None or not recording_id:
+        return jsonify({'error': 'Missing chunk index or recording ID.'}), 400
+
+    # Track the upload in the result store so every worker agrees on the next chunk
+    upload_key = f"upload:{session.get('session_id')}"
+    upload = result_store.get(upload_key)
+    if not upload or upload['recording'] != recording_id:
+        upload = {'recording': recording_id, 'next_index': 0, 'size': 0}
+
+    if chunk_index < upload['next_index']:
+        return jsonify({'received': chunk_index})
+    if chunk_index > upload['next_index']:
+        return jsonify({'error': 'Chunk out of sequence.', 'expected': upload['next_index']}), 409
+
+    # Write at the end of the chunks received so far, dropping anything left by an interrupted write
+    video_filename = get_session_upload_path('recorded_interview.mp4')
+    with open(video_filename, 'r+b' if upload['size'] else 'wb') as video_file:
+        video_file.seek(upload['size'])
+        video_file.truncate()
+        while True:
+            block = request.stream.read(64 * 1024)
+            if not block:
+                break
+            video_file.write(block)
+        size = video_file.tell()
+
+    upload.update(next_index=chunk_index + 1, size=size)
+    result_store.set(upload_key, upload)
+    return jsonify({'received': chunk_index})
+
+
+def parse_question_marks(raw_marks, num_questions):
+    """
+    Validate the question timestamps sent with a recording.
+
+    Args:
+        raw_marks (str): JSON list of [question_index, start_seconds] pairs.
+        num_questions (int): The number of questions in the interview.
+
+    Returns:
+        list: (question_index, start_seconds) tuples sorted by start, or an empty list if they are invalid.
+    """
+    try:
+        marks = [(int(question_index), float(start)) for question_index, start in json.loads(raw_marks or '[]')]
+    except (TypeError, ValueError):
+        return []
+
+    if any(not 0 <= question_index < num_questions or start < 0 for question_index, start in marks):
+        return []
+    return sorted(marks, key=lambda mark: mark[1])
 
 
 @app.route('/submit-video', methods=['POST'])
 def submit_video():
-    """Handle video submission and save the recorded video."""
-    video_data = request.form.get('video_data')
-
-    if video_data:
-        # Remove Base64 header and decode video data
-        video_data = video_data.split(",")[1]
-        video_bytes = base64.b64decode(video_data)
-
-        # Save the video to a file
-        video_filename = os.path.join(app.config['UPLOAD_FOLDER'], 'recorded_interview.mp4')
-        with open(video_filename, 'wb') as video_file:
-            video_file.write(video_bytes)
+    """Finish the chunked upload of the recorded video and start on its feedback."""
+    video_filename = get_session_upload_path('recorded_interview.mp4')
 
+    if os.path.exists(video_filename) and os.path.getsize(video_filename) > 0:
         session['video_filename'] = video_filename
         print(f"Video saved at: {video_filename}")
 
+        # When each answer can be reviewed on its own, the recording is split instead of uploaded whole
+        num_questions = len(get_session_job_result().get('questions', []))
+        question_marks = parse_question_marks(request.form.get('question_marks'), num_questions)
+        # Structured feedback covers every answer in one response, so the recording is not split for it
+        split = len(question_marks) > 1 and can_split_recording() and not app.config['STRUCTURED_FEEDBACK']
+        session['question_marks'] = question_marks if split else []
+
+        # Start on the feedback while the feedback page loads, uploading or transcribing the recording first
+        try:
+            start_feedback_processing()
+        except QueueFullError:
+            print("Feedback pool is full, the feedback page will queue the job again.")
+
     return redirect(url_for('feedback_loading'))
 
 
-@app.route('/feedback-loading')
-def feedback_loading():
-    """Display loading screen while feedback is being processed."""
+def process_feedback(feedback_id, job_description, video_filename, questions=None, question_marks=None):
+    """Generate the feedback for a recording and store it in the result store."""
+    feedback_key = f"feedback:{feedback_id}"
+
+    def on_text(partial_feedback):
+        result_store.set(f"feedback_partial:{feedback_id}", partial_feedback)
+
+    try:
+        feedback = generate_feedback(job_description, video_filename, questions, question_marks, on_text,
+                                     app.config['STRUCTURED_FEEDBACK'])
+        print(f"Feedback received: {feedback}")
+        result_store.set(feedback_key, feedback)
+    finally:
+        result_store.release(feedback_key)
+
+
+def generate_feedback(job_description, video_filename, questions, question_marks, on_text, structured=False):
+    """
+    Ask Gemini for feedback on a recording, in the way the recording was prepared for.
+
+    Returns:
+        str or dict: The feedback, its sections in structured mode, or an error message.
+    """
+    if not video_filename:
+        return "No video file found for feedback."
+
+    transcript = None
+    if transcription_enabled():
+        # Transcribe offline, the video itself is not uploaded
+        try:
+            transcript = transcribe_recording(video_filename)
+        except Exception as e:
+            print(f"Transcription failed, reviewing the video instead: {e}")
+
+    if transcript:
+        try:
+            keyframes = sample_keyframes(video_filename)
+        except Exception as e:
+            print(f"Could not sample keyframes, reviewing the transcript only: {e}")
+            keyframes = []
+        return get_transcript_feedback_from_gemini(job_description, transcript, keyframes, on_text,
+                                                   structured=structured, questions=questions)
+
+    if keyframe_feedback_enabled():
+        return get_keyframe_feedback_from_gemini(job_description, video_filename, on_text,
+                                                 structured=structured, questions=questions)
+
+    if question_marks:
+        answers = [
+            (questions[question_index], start, end)
+            for question_index, start, end in answer_segments(question_marks)
+        ]
+        return get_segmented_feedback_from_gemini(job_description, video_filename, answers, on_text)
+
+    return get_interview_feedback_from_gemini(job_description, video_filename, on_text=on_text,
+                                              structured=structured, questions=questions)
+
+
+def start_feedback_processing():
+    """
+    Queue feedback processing for the current session unless it is done or already running.
+
+    Raises:
+        QueueFullError: If the feedback pool cannot accept any more jobs.
+    """
     feedback_id = session.get('feedback_id')
+    feedback_key = f"feedback:{feedback_id}"
 
-    if feedback_id not in feedback_cache:
-        print("Starting background feedback processing...")
+    if feedback_pool.is_in_flight(feedback_id) or result_store.get(feedback_key) is not None:
+        return
 
-        @copy_current_request_context
-        def process_feedback_thread():
-            """Background thread for processing feedback."""
-            job_description = session.get('job_description', 'No job description available')
-            video_filename = session.get('video_filename')
+    # Only the worker that wins the claim starts processing this feedback_id
+    if not result_store.claim(feedback_key):
+        return
 
-            if video_filename:
-                feedback = get_interview_feedback_from_gemini(job_description, video_filename)
-                print(f"Feedback received: {feedback}")
-            else:
-                feedback = "No video file found for feedback."
+    interview = get_session_job_result()
+    job_description = interview.get('job_description', 'No job description available')
+    questions = [question['question'] for question in interview.get('questions', [])]
+    try:
+        feedback_pool.submit(feedback_id, process_feedback, feedback_id, job_description,
+                             session.get('video_filename'), questions, session.get('question_marks'))
+        print("Queued background feedback processing...")
+    except QueueFullError:
+        result_store.release(feedback_key)
+        raise
 
-            feedback_cache[feedback_id] = feedback
 
-        threading.Thread(target=process_feedback_thread).start()
+@app.route('/feedback-loading')
+def feedback_loading():
+    """Display loading screen while feedback is being processed."""
+    try:
+        start_feedback_processing()
+    except QueueFullError as e:
+        # The page keeps polling /check-feedback-status, which retries the submission
+        return render_template('feedback_loading.html'), 429, {'Retry-After': str(e.retry_after)}
 
     return render_template('feedback_loading.html')
 
@@ -158,19 +500,75 @@ def feedback_loading():
 def check_feedback_status():
     """Check if feedback is ready."""
     feedback_id = session.get('feedback_id')
-    feedback = feedback_cache.get(feedback_id)
+    feedback = result_store.get(f"feedback:{feedback_id}")
 
     if feedback:
         return jsonify({'status': 'done', 'feedback': feedback})
 
+    # Requeue the job if it was never started or its worker went away
+    try:
+        start_feedback_processing()
+    except QueueFullError as e:
+        response = jsonify({'status': 'queued', 'retry_after': e.retry_after})
+        return response, 429, {'Retry-After': str(e.retry_after)}
+
     return jsonify({'status': 'processing'})
 
 
+@app.route('/feedback-stream')
+def feedback_stream():
+    """Stream the feedback to the browser with Server-Sent Events while Gemini generates it."""
+    feedback_id = session.get('feedback_id')
+    try:
+        start_feedback_processing()
+    except QueueFullError as e:
+        response = jsonify({'status': 'queued', 'retry_after': e.retry_after})
+        return response, 429, {'Retry-After': str(e.retry_after)}
+
+    def events():
+        sent = ''
+        sent_sections = set()
+        last_event_at = time.monotonic()
+        deadline = last_event_at + app.config['FEEDBACK_STREAM_TIMEOUT']
+        while time.monotonic() < deadline:
+            feedback = result_store.get(f"feedback:{feedback_id}")
+            if feedback:
+                # The final event carries the whole feedback, which replaces the streamed text
+                key = 'sections' if isinstance(feedback, dict) else 'text'
+                yield f"event: done\ndata: {json.dumps({key: feedback})}\n\n"
+                return
+
+            partial_feedback = result_store.get(f"feedback_partial:{feedback_id}") or ''
+            if isinstance(partial_feedback, dict):
+                # Structured feedback is sent one finished section at a time
+                new_sections = [name for name in partial_feedback if name not in sent_sections]
+                for name in new_sections:
+                    yield f"event: section\ndata: {json.dumps({'name': name, 'value': partial_feedback[name]})}\n\n"
+                    sent_sections.add(name)
+                if new_sections:
+                    last_event_at = time.monotonic()
+            elif len(partial_feedback) > len(sent):
+                yield f"data: {json.dumps({'text': partial_feedback[len(sent):]})}\n\n"
+                sent = partial_feedback
+                last_event_at = time.monotonic()
+
+            if time.monotonic() - last_event_at > 15:
+                # Comment line that keeps proxies from closing an idle connection, in either mode
+                yield ": waiting\n\n"
+                last_event_at = time.monotonic()
+            time.sleep(0.5)
+
+        yield "event: timeout\ndata: {}\n\n"
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/feedback')
 def feedback():
     """Display the feedback page."""
     feedback_id = session.get('feedback_id')
-    feedback_text = feedback_cache.get(feedback_id, "No feedback available.")
+    feedback_text = result_store.get(f"feedback:{feedback_id}") or "No feedback available."
     return render_template('feedback.html', feedback=feedback_text)
 
 
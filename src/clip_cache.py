@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Folder holding the cached clips
+CACHE_DIR = os.path.join(script_dir, 'static', 'videos', 'cache')
+
+# Least recently used clips are evicted once the cache grows past this size
+MAX_CACHE_BYTES = int(os.getenv('CLIP_CACHE_MAX_BYTES', 500 * 1024 * 1024))
+
+_cache_lock = threading.Lock()
+
+
+def clip_key(avatar_id, voice_id, text, style):
+    """
+    Build the cache key for a rendered clip.
+
+    Args:
+        avatar_id (str): The D-ID presenter ID.
+        voice_id (str): The voice used for the script.
+        text (str): The text spoken in the clip.
+        style (str): The voice style.
+
+    Returns:
+        str: A hex digest identifying the clip contents.
+    """
+    key_data = json.dumps([avatar_id, voice_id, text.strip(), style])
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+
+def _cache_path(key):
+    """Return the path of the cached clip for a key."""
+    return os.path.join(CACHE_DIR, f'{key}.mp4')
+
+
+def link_clip(source_path, video_path):
+    """
+    Place a clip at video_path without copying it if possible.
+
+    The destination is hard-linked to the source, falling back to a copy when the
+    two paths are on different file systems. The clip is renamed into place, so an
+    existing file at video_path is replaced atomically and never written through.
+
+    Args:
+        source_path (str): The existing clip.
+        video_path (str): Where the clip should appear.
+    """
+    os.makedirs(os.path.dirname(video_path), exist_ok=True)
+    temp_path = f'{video_path}.{uuid.uuid4().hex}.part'
+    try:
+        os.link(source_path, temp_path)
+    except OSError:
+        shutil.copyfile(source_path, temp_path)
+    os.replace(temp_path, video_path)
+
+
+def get_cached_clip(key):
+    """
+    Look up a clip in the cache.
+
+    Args:
+        key (str): The key returned by clip_key.
+
+    Returns:
+        str: The path of the cached clip, or None on a cache miss.
+    """
+    path = _cache_path(key)
+    try:
+        # Mark the clip as recently used
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def store_clip(key, video_path):
+    """
+    Add a rendered clip to the cache and evict old clips if the cache is full.
+
+    Args:
+        key (str): The key returned by clip_key.
+        video_path (str): The path of the freshly rendered clip.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with _cache_lock:
+        try:
+            link_clip(video_path, _cache_path(key))
+        except OSError as e:
+            print(f'Error caching clip {video_path}: {e}')
+            return
+        evict_clips(MAX_CACHE_BYTES)
+
+
+def evict_clips(max_bytes):
+    """
+    Remove least recently used clips until the cache fits in max_bytes.
+
+    Args:
+        max_bytes (int): The maximum total size of the cache.
+    """
+    entries = []
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith('.mp4'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total_size -= size
+        except OSError:
+            pass
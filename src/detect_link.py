@@ -1,15 +1,58 @@
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from urllib.parse import urlparse, parse_qs
 from webscrape_jobs_indeed import get_indeed_job_info
 from webscrape_jobs_linkedin import get_linkedin_job_info
 from webscrape_jobs_totaljobs import get_totaljobs_job_info
+from ttl_cache import TTLCache
 
-def detect_link(job_description: str):
-    """Pass description and find corresponding links to job sites."""
+# Scraper for each supported job site
+JOB_INFO_FETCHERS = {
+    'indeed': get_indeed_job_info,
+    'linkedin': get_linkedin_job_info,
+    'totaljobs': get_totaljobs_job_info,
+}
+
+# Display names used in error messages
+SITE_NAMES = {
+    'indeed': 'Indeed',
+    'linkedin': 'LinkedIn',
+    'totaljobs': 'TotalJobs',
+}
+
+# Scraped job info is kept for 6 hours, failures are remembered for 5 minutes
+JOB_INFO_TTL = 6 * 60 * 60
+FAILURE_TTL = 5 * 60
+
+# Shared cache of scraped job info, keyed on (site, job_id)
+job_info_cache = TTLCache(max_entries=1000, ttl=JOB_INFO_TTL)
+
+# Marker cached for postings that could not be scraped
+_SCRAPE_FAILED = object()
+
+# All links in a description must be resolved within this many seconds
+DETECT_LINK_TIMEOUT = 60
+
+# Shared pool resolving job links concurrently
+_fetch_executor = ThreadPoolExecutor(max_workers=6)
+
+
+def find_job_links(job_description: str):
+    """
+    Find the links to supported job sites in a description.
+
+    Args:
+        job_description (str): The pasted job description or link.
+
+    Returns:
+        list: (site, job_id) tuples in the order the links appear.
+    """
     # Extract URLs from job_description
     url_pattern = r'(https?://[^\s]+)'
     urls = re.findall(url_pattern, job_description)
 
+    job_links = []
     for url in urls:
         parsed_url = urlparse(url)
         domain = parsed_url.netloc.lower()
@@ -20,28 +63,86 @@ def detect_link(job_description: str):
             params = parse_qs(query)
             job_key_list = params.get('jk')
             if job_key_list:
-                job_key = job_key_list[0]
-                try:
-                    job_description = get_indeed_job_info(job_key)
-                    break
-                except Exception as e:
-                    print(f"Error fetching Indeed job info: {e}")
+                job_links.append(('indeed', job_key_list[0]))
         elif 'linkedin.com' in domain and '/jobs/' in path:
             params = parse_qs(query)
             job_id_list = params.get('currentJobId')
             if job_id_list:
-                job_id = job_id_list[0]
-                try:
-                    job_description = get_linkedin_job_info(job_id)
-                    break
-                except Exception as e:
-                    print(f"Error fetching LinkedIn job info: {e}")
+                job_links.append(('linkedin', job_id_list[0]))
         elif 'totaljobs.com' in domain and path.startswith('/job/'):
             job_id = path.split('/job/')[1].split('/')[0]
+            job_links.append(('totaljobs', job_id))
+
+    return job_links
+
+
+def get_job_info(site: str, job_id: str):
+    """
+    Return the title and description of a job posting, using the shared cache.
+
+    Args:
+        site (str): The job site ('indeed', 'linkedin' or 'totaljobs').
+        job_id (str): The ID of the posting on that site.
+
+    Raises:
+        ValueError: If the posting could not be scraped recently.
+        Exception: Any error raised by the scraper.
+
+    Returns:
+        str: The job title and description separated by a line break.
+    """
+    cache_key = (site, job_id)
+    job_info = job_info_cache.get(cache_key)
+    if job_info is _SCRAPE_FAILED:
+        raise ValueError(f"Scraping {SITE_NAMES[site]} job {job_id} failed recently.")
+    if job_info is not None:
+        return job_info
+
+    try:
+        job_info = JOB_INFO_FETCHERS[site](job_id)
+    except Exception:
+        job_info_cache.set(cache_key, _SCRAPE_FAILED, ttl=FAILURE_TTL)
+        raise
+
+    job_info_cache.set(cache_key, job_info)
+    return job_info
+
+
+def detect_link(job_description: str, timeout: float = DETECT_LINK_TIMEOUT):
+    """
+    Pass description and find corresponding links to job sites.
+
+    Every recognised link is scraped concurrently. Results are taken in the order
+    the links appear, so the first link that scrapes successfully wins as soon as
+    every link before it has failed, and the remaining scrapes are cancelled.
+
+    Args:
+        job_description (str): The pasted job description or link.
+        timeout (float): Seconds to wait for a successful scrape before giving up.
+
+    Returns:
+        str: The scraped job title and description, or job_description unchanged.
+    """
+    # Drop duplicate links while keeping their order
+    job_links = list(dict.fromkeys(find_job_links(job_description)))
+    if not job_links:
+        return job_description
+
+    deadline = time.monotonic() + timeout
+    futures = [_fetch_executor.submit(get_job_info, site, job_id) for site, job_id in job_links]
+
+    try:
+        for (site, job_id), future in zip(job_links, futures):
             try:
-                job_description = get_totaljobs_job_info(job_id)
+                return future.result(timeout=max(0, deadline - time.monotonic()))
+            except TimeoutError:
+                print(f"Timed out fetching job info after {timeout} seconds.")
                 break
             except Exception as e:
-                print(f"Error fetching TotalJobs job info: {e}")
+                print(f"Error fetching {SITE_NAMES[site]} job info: {e}")
+    finally:
+        # Scrapes that have not started yet are no longer needed
+        for future in futures:
+            future.cancel()
 
     return job_description
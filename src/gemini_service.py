@@ -1,23 +1,175 @@
 from dotenv import load_dotenv
 import os
-import google.generativeai as genai
+import re
+import json
 import time
+import random
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from providers import register_provider, get_provider
+from result_store import SQLiteResultStore
+from video_proxy import prepare_recording, cut_segment, extract_audio_track
+from keyframes import sample_keyframes, pack_keyframes
+from transcribe import transcribe_recording, format_transcript
 
-# Load environment variables from .env file
-load_dotenv()
+# Name of the Gemini model used for every request
+MODEL_NAME = "gemini-1.5-flash"
 
-# Get the Gemini API key
-os.environ['KEY'] = os.getenv("GEMINI_API_KEY")
+# Answers reviewed at once when a recording is split per question, and how long each review may take
+MAX_ANSWER_WORKERS = 4
+ANSWER_FEEDBACK_TIMEOUT = 300
 
-if not os.environ['KEY']:
-    raise ValueError("Gemini API Key not provided. Please provide GEMINI_API_KEY as an environment variable")
+# Sections of a structured feedback response, in the order Gemini writes them, and the scores it gives
+FEEDBACK_SECTIONS = ['body_language', 'communication', 'relevance', 'scores', 'summary']
+SCORE_NAMES = ['body_language', 'communication', 'relevance', 'overall']
 
-# Configure the Gemini API
-genai.configure(api_key=os.environ["KEY"])
-model = genai.GenerativeModel("gemini-1.5-flash")
+# Appended to prompts whose answer is shown as plain text in a HTML paragraph
+HTML_PARAGRAPH_INSTRUCTIONS = ("Present the feedback in a way that would render well in a HTML <p></p> paragraph, "
+                               "no unnecessary markup, and without any html <p></p> tags.")
+
+
+class VideoProcessingError(ValueError):
+    """Raised when Gemini accepts an uploaded recording but fails to process it."""
+
+
+def create_genai():
+    """
+    Import and configure the Gemini SDK. Called on first use, not at import time.
+
+    Raises:
+        ValueError: If the Gemini API key is not set.
+
+    Returns:
+        module: The configured google.generativeai module.
+    """
+    import google.generativeai as genai
+
+    # Load environment variables from .env file
+    load_dotenv()
+
+    # Get the Gemini API key
+    os.environ['KEY'] = os.getenv("GEMINI_API_KEY") or ''
+
+    if not os.environ['KEY']:
+        raise ValueError("Gemini API Key not provided. Please provide GEMINI_API_KEY as an environment variable")
+
+    # Configure the Gemini API
+    genai.configure(api_key=os.environ["KEY"])
+    return genai
+
+
+def create_model():
+    """Build the Gemini model shared by every request."""
+    return get_provider('genai').GenerativeModel(MODEL_NAME)
+
+
+def create_response_cache():
+    """
+    Create the opt-in cache of Gemini text responses.
+
+    The cache is enabled by setting GEMINI_RESPONSE_CACHE=1. GEMINI_CACHE_TTL sets how
+    long responses are kept, GEMINI_CACHE_MAX_ENTRIES bounds its size, and
+    GEMINI_CACHE_VARIATIONS sets how many different responses are collected per
+    prompt before cached ones are reused.
+
+    Returns:
+        ResponseCache: The cache, disabled unless GEMINI_RESPONSE_CACHE=1.
+    """
+    load_dotenv()
+    if os.getenv("GEMINI_RESPONSE_CACHE") != '1':
+        return ResponseCache(None)
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    store = SQLiteResultStore(
+        os.path.join(script_dir, 'instance', 'gemini_responses.db'),
+        ttl=int(os.getenv("GEMINI_CACHE_TTL", 7 * 24 * 60 * 60)),
+        max_entries=int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", 5000))
+    )
+    return ResponseCache(store, variations=int(os.getenv("GEMINI_CACHE_VARIATIONS", 1)))
+
+
+class ResponseCache:
+    """
+    Cache of Gemini text responses keyed on a hash of the normalised prompt.
+
+    Up to `variations` different responses are kept per prompt. Until that many
+    have been collected every request goes to Gemini, after that a cached response
+    is picked at random.
+    """
+
+    def __init__(self, store, variations=1):
+        self.store = store
+        self.variations = max(1, variations)
+
+    @property
+    def enabled(self):
+        return self.store is not None
+
+    @staticmethod
+    def key(prompt, generation_config=None):
+        """Hash the prompt with whitespace and case normalised, plus the model settings."""
+        normalized_prompt = re.sub(r'\s+', ' ', prompt).strip().lower()
+        key_data = json.dumps([MODEL_NAME, normalized_prompt, generation_config], sort_keys=True)
+        return "gemini:" + hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return a cached response, or None if fewer than `variations` have been collected."""
+        responses = self.store.get(key) or []
+        if len(responses) < self.variations:
+            return None
+        return random.choice(responses)
+
+    def add(self, key, response_text):
+        """Add a response to the variations cached for a prompt."""
+        responses = self.store.get(key) or []
+        if response_text not in responses:
+            responses = (responses + [response_text])[-self.variations:]
+            self.store.set(key, responses)
+
+
+register_provider('genai', create_genai)
+register_provider('gemini_model', create_model)
+register_provider('gemini_response_cache', create_response_cache)
+
+
+def _generate_text(prompt, fresh=False, generation_config=None, validate=None):
+    """
+    Generate a text response, serving it from the response cache when enabled.
+
+    Args:
+        prompt (str): The prompt to send.
+        fresh (bool): Skip cached responses and ask Gemini for a new one.
+        generation_config (dict, optional): Passed on to generate_content.
+        validate (callable, optional): Raises if a response should not be cached.
+
+    Raises:
+        ValueError: If Gemini returns no response.
+
+    Returns:
+        str: The response text.
+    """
+    cache = get_provider('gemini_response_cache')
+    cache_key = ResponseCache.key(prompt, generation_config) if cache.enabled else None
+
+    if cache_key and not fresh:
+        response_text = cache.get(cache_key)
+        if response_text is not None:
+            print("Gemini response served from cache.")
+            return response_text
+
+    response = get_provider('gemini_model').generate_content(prompt, generation_config=generation_config)
+    if response is None or not hasattr(response, 'text'):
+        raise ValueError("Received no response or invalid response from the Gemini API.")
+
+    response_text = response.text
+    if cache_key:
+        if validate:
+            validate(response_text)
+        cache.add(cache_key, response_text)
+    return response_text
 
 # Function to generate the intro script from the Gemini API
-def get_intro_script_from_gemini(job_description, num_questions, avatar):
+def get_intro_script_from_gemini(job_description, num_questions, avatar, fresh=False):
     """
     Generates an interview introduction script using the Gemini API.
 
@@ -31,6 +183,7 @@ def get_intro_script_from_gemini(job_description, num_questions, avatar):
         job_description (str): The job description or link to the job posting.
         num_questions (int): The number of interview questions to be asked.
         avatar (str): The avatar or persona that will represent the interviewer.
+        fresh (bool): Skip the response cache and generate a new script.
 
     Returns:
         str: A generated intro script for the interview, or an error message if 
@@ -53,10 +206,7 @@ def get_intro_script_from_gemini(job_description, num_questions, avatar):
     
     try:
         # Call the Gemini model to generate the intro script
-        response = model.generate_content(prompt)
-        
-        # Extract the generated intro script from the response
-        generated_intro_script = response.text
+        generated_intro_script = _generate_text(prompt, fresh)
         return generated_intro_script
 
     except Exception as e:
@@ -65,8 +215,53 @@ def get_intro_script_from_gemini(job_description, num_questions, avatar):
         return "There was an error generating the intro script. Please try again later."
 
 
+def _build_questions_with_videos(generated_questions):
+    """
+    Finish a generated question list and pair each question with its video path.
+
+    Args:
+        generated_questions (list): The question texts returned by Gemini.
+
+    Returns:
+        list: Dictionaries with 'question' and 'video_path' keys.
+    """
+    # Ensure the final question is included exactly once
+    final_question = "Do you have any questions for me?"
+
+    # Remove any existing instances of the final question from the list
+    if final_question in generated_questions:
+        generated_questions.remove(final_question)
+
+    # Append the final question at the end of the list
+    generated_questions.append(final_question)
+
+    # Debugging: print the generated questions
+    print(f"Generated questions: {generated_questions}")
+
+    # Return questions with video paths
+    questions_with_videos = []
+    for i, question in enumerate(generated_questions):
+        video_filename = f"question_video_{i+1}.mp4"
+        video_path = os.path.join("static/videos", video_filename)
+
+        # Append the question and the generated video path
+        questions_with_videos.append({'question': question, 'video_path': video_path})
+
+    return questions_with_videos
+
+
+def _questions_prompt(job_description, num_questions, complexity):
+    """Build the prompt asking for num_questions - 1 questions, one per line."""
+    return (f"Generate a list of {num_questions - 1} interview questions. "
+            f"These questions should be at a {complexity} level and should be presented as a clean list, with no extra text or introduction, or symbols. "
+            f"Please ensure the final question is NOT anything related to 'Do you have any questions for me?'."
+            f" The first question can be 'Tell me about yourself and why you are a good fit for this job'."
+            f" Return the list with one question per line, without explanations or other commentary."
+            f" Based on the following job description: {job_description}.")
+
+
 # Function to generate interview questions from the Gemini API
-def get_questions_from_gemini(job_description, num_questions, complexity, avatar):
+def get_questions_from_gemini(job_description, num_questions, complexity, avatar, fresh=False):
     """
     Generates interview questions based on the job description and complexity level using the Gemini API.
 
@@ -79,6 +274,7 @@ def get_questions_from_gemini(job_description, num_questions, complexity, avatar
         num_questions (int): The total number of questions to generate (including the final question).
         complexity (str): The complexity level of the questions (e.g., 'beginner', 'intermediate', 'complex').
         avatar (str): The interviewer.
+        fresh (bool): Skip the response cache and generate new questions.
 
     Returns:
         list: A list of generated interview questions and video paths, or an error message if the API request fails.
@@ -87,61 +283,267 @@ def get_questions_from_gemini(job_description, num_questions, complexity, avatar
         get_questions_from_gemini("Frontend Developer at ABC", 5, "intermediate", "Matt")
     """
     # Prepare the prompt for generating interview questions
-    prompt = (f"Generate a list of {num_questions - 1} interview questions. "
-              f"These questions should be at a {complexity} level and should be presented as a clean list, with no extra text or introduction, or symbols. "
-              f"Please ensure the final question is NOT anything related to 'Do you have any questions for me?'."
-              f" The first question can be 'Tell me about yourself and why you are a good fit for this job'."
-              f" Return the list with one question per line, without explanations or other commentary."
-              f" Based on the following job description: {job_description}.")
-    
+    prompt = _questions_prompt(job_description, num_questions, complexity)
+
     try:
         # Call the Gemini model to generate the interview questions
-        response = model.generate_content(prompt)
+        response_text = _generate_text(prompt, fresh)
 
-        if response is None or not hasattr(response, 'text'):
-            raise ValueError("Received no response or invalid response from the Gemini API.")
-        
         # Split the response text into individual lines/questions
-        generated_questions = response.text.strip().split("\n")
+        generated_questions = response_text.strip().split("\n")
+
+        # Filter out any empty lines and remove leading/trailing whitespace, keeping only the questions asked for
+        generated_questions = [q.strip() for q in generated_questions if q.strip()][:num_questions - 1]
+
+        return _build_questions_with_videos(generated_questions)
+
+    except Exception as e:
+        # Handle errors gracefully
+        print(f"Error generating questions: {e}")
+        return ["There was an error generating the question videos. Please try again later."]
 
-        # Filter out any empty lines and remove leading/trailing whitespace
-        generated_questions = [q.strip() for q in generated_questions if q.strip()]
 
-        # Ensure the final question is included exactly once
-        final_question = "Do you have any questions for me?"
+# Function to generate the intro script and the questions in a single Gemini request
+def get_intro_and_questions_from_gemini(job_description, num_questions, complexity, avatar, fresh=False):
+    """
+    Generates the interview introduction script and the interview questions in one Gemini request.
 
-        # Remove any existing instances of the final question from the list
-        if final_question in generated_questions:
-            generated_questions.remove(final_question)
+    Both are returned as one JSON object, which saves sending the job description
+    twice and takes one model round trip off the critical path. If the response is
+    not valid JSON of the expected shape, the intro script and questions are
+    requested separately instead, with both requests running concurrently.
 
-        # Append the final question at the end of the list
-        generated_questions.append(final_question)
+    Args:
+        job_description (str): The job description to tailor the script and questions to.
+        num_questions (int): The total number of questions (including the final question).
+        complexity (str): The complexity level of the questions (e.g., 'beginner', 'intermediate', 'complex').
+        avatar (str): The avatar or persona that will represent the interviewer.
+        fresh (bool): Skip the response cache and generate a new script and questions.
 
-        # Debugging: print the generated questions
-        print(f"Generated questions: {generated_questions}")
+    Returns:
+        tuple: (intro_script, questions) in the same format as get_intro_script_from_gemini
+               and get_questions_from_gemini.
 
-        # Generate videos for each question and return questions with video paths
-        questions_with_videos = []
-        for i, question in enumerate(generated_questions):
-            video_filename = f"question_video_{i+1}.mp4"
-            video_path = os.path.join("static/videos", video_filename)
-            
-            # Call the video generation function
-            # generate_video_for_question(question, video_path, avatar)
-            
-            # Append the question and the generated video path
-            questions_with_videos.append({'question': question, 'video_path': video_path})
+    Example Usage:
+        get_intro_and_questions_from_gemini("Data Analyst at XYZ", 4, "beginner", "Diana")
+    """
+    # Prepare the prompt for the combined request
+    prompt = (f"Prepare a job interview and return it as a JSON object with two keys: 'intro_script' and 'questions'."
+              f" 'intro_script' is a short interview introduction script, in the first person (as the interviewer), and brief."
+              f" Saying, hello, I am {avatar} from the interviewing company."
+              f" This interview is for the role in the job listing."
+              f" Please do not leave any placeholders like [Your Name] or [Interviewer's Name] or [Company Name] in the script."
+              f" You will ask {num_questions} questions, and the interview will need to be recorded to provide feedback."
+              f" Ask the candidate to click the button that will come up in a second, which will take them to the interview."
+              f" Advise them to start the recording straight away so the whole interview is captured."
+              f" The interview questions will be in separate videos, and they should answer them chronologically, one at a time."
+              f" Wish them the best of luck and say, 'Let's get started!'"
+              f" If details for the script are missing, fill in appropriate and realistic values based on the job description."
+              f" 'questions' is a list of exactly {num_questions - 1} interview question strings at a {complexity} level,"
+              f" with no numbering, symbols or commentary."
+              f" The final question must NOT be anything related to 'Do you have any questions for me?'."
+              f" The first question can be 'Tell me about yourself and why you are a good fit for this job'."
+              f" The job description is: {job_description}.")
 
-        return questions_with_videos
+    try:
+        # Call the Gemini model in JSON mode
+        response_text = _generate_text(prompt, fresh, generation_config={"response_mime_type": "application/json"},
+                                       validate=lambda text: _parse_intro_and_questions(text, num_questions))
+        intro_script, generated_questions = _parse_intro_and_questions(response_text, num_questions)
+        return intro_script, _build_questions_with_videos(generated_questions)
 
     except Exception as e:
-        # Handle errors gracefully
-        print(f"Error generating questions: {e}")
-        return ["There was an error generating the question videos. Please try again later."]
+        print(f"Combined intro and questions request failed, falling back to separate requests: {e}")
+
+    # Fall back to two requests, sent at the same time
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        intro_future = executor.submit(get_intro_script_from_gemini, job_description, num_questions, avatar, fresh)
+        questions_future = executor.submit(get_questions_from_gemini, job_description, num_questions, complexity,
+                                           avatar, fresh)
+        return intro_future.result(), questions_future.result()
+
+
+def _parse_intro_and_questions(response_text, num_questions):
+    """
+    Parse and validate the JSON returned by the combined intro and questions request.
+
+    Extra questions are dropped, so the interview has no more clips than were planned for.
+
+    Args:
+        response_text (str): The raw response text.
+        num_questions (int): The total number of questions (including the final question).
+
+    Raises:
+        ValueError: If the response does not match the expected schema.
+
+    Returns:
+        tuple: (intro_script, questions) where questions is a list of at most num_questions - 1 non-empty strings.
+    """
+    data = json.loads(response_text)
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object.")
+
+    intro_script = data.get('intro_script')
+    if not isinstance(intro_script, str) or not intro_script.strip():
+        raise ValueError("Missing or empty 'intro_script'.")
+
+    questions = data.get('questions')
+    if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+        raise ValueError("'questions' must be a list of strings.")
+
+    questions = [q.strip() for q in questions if q.strip()]
+    if not questions:
+        raise ValueError("No questions returned.")
+
+    return intro_script.strip(), questions[:num_questions - 1]
+
+
+# Function to stream interview questions from the Gemini API one at a time
+def stream_questions_from_gemini(job_description, num_questions, complexity, fresh=False):
+    """
+    Yields interview questions one by one as Gemini generates them.
+
+    The prompt is the same as get_questions_from_gemini, but the response is
+    streamed and each question is yielded as soon as its line is complete, so the
+    caller can start rendering it while the rest are still being written. The
+    final question is always "Do you have any questions for me?".
+
+    The stream is read to the end even once enough questions have been yielded,
+    so the complete response can be cached. If streaming fails, the remaining
+    questions come from a regular get_questions_from_gemini request.
+
+    Args:
+        job_description (str): The job description to tailor the questions to.
+        num_questions (int): The total number of questions (including the final question).
+        complexity (str): The complexity level of the questions (e.g., 'beginner', 'intermediate', 'complex').
+        fresh (bool): Skip the response cache and generate new questions.
+
+    Raises:
+        ValueError: If neither the stream nor the fallback request returned any questions.
+
+    Yields:
+        str: The text of each question, in order.
+    """
+    final_question = "Do you have any questions for me?"
+    prompt = _questions_prompt(job_description, num_questions, complexity)
+    cache = get_provider('gemini_response_cache')
+    cache_key = ResponseCache.key(prompt) if cache.enabled else None
+
+    def complete_lines():
+        """Yield each complete line of the response, from the cache or the stream."""
+        cached_text = cache.get(cache_key) if cache_key and not fresh else None
+        if cached_text is not None:
+            print("Gemini response served from cache.")
+            yield from cached_text.split("\n")
+            return
+
+        response_text = ''
+        streamed = False
+        try:
+            buffer = ''
+            response = get_provider('gemini_model').generate_content(prompt, stream=True)
+            for chunk in response:
+                response_text += chunk.text
+                buffer += chunk.text
+                *lines, buffer = buffer.split("\n")
+                yield from lines
+            yield buffer
+            streamed = True
+        finally:
+            # Only a response that streamed to the end is cached
+            if streamed and cache_key:
+                cache.add(cache_key, response_text)
+
+    count = 0
+    try:
+        for line in complete_lines():
+            question = line.strip()
+            if not question or question == final_question or count >= num_questions - 1:
+                continue
+            yield question
+            count += 1
+    except Exception as e:
+        print(f"Error streaming questions, falling back to a single request: {e}")
+        questions = [
+            question['question'] for question in
+            get_questions_from_gemini(job_description, num_questions, complexity, None, fresh)
+            if isinstance(question, dict) and question['question'] != final_question
+        ]
+        if not count and not questions:
+            raise ValueError("No interview questions could be generated.")
+        for question in questions[count:num_questions - 1]:
+            yield question
+
+    yield final_question
+
+
+# Function to upload an interview recording to the Gemini Files API
+def upload_interview_video(video_file_path, initial_delay=0.5, max_delay=8, mime_type=None):
+    """
+    Upload a video file to Gemini and wait until it has been processed.
+
+    The upload uses the Files API's resumable protocol. The processing state is
+    polled with exponential backoff, starting at sub-second intervals so short
+    recordings are picked up as soon as they are ready.
+
+    Args:
+        video_file_path (str): The path to the video file to upload.
+        initial_delay (float): Seconds to wait before the first status check.
+        max_delay (float): The longest wait between two status checks, in seconds.
+        mime_type (str, optional): The file's MIME type. Guessed from the path if not given.
+
+    Raises:
+        VideoProcessingError: If Gemini fails to process the video.
+
+    Returns:
+        File: The processed Gemini file, ready to be used in a prompt.
+    """
+    # Upload the video file
+    print(f"Uploading file: {video_file_path}...")
+    video_file = get_provider('genai').upload_file(path=video_file_path, mime_type=mime_type)
+    print(f"Upload completed: {video_file.uri}")
+
+    # Check the file's processing state
+    delay = initial_delay
+    while video_file.state.name == "PROCESSING":
+        print("Processing...", end='', flush=True)
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+        video_file = get_provider('genai').get_file(video_file.name)
+
+    if video_file.state.name == "FAILED":
+        raise VideoProcessingError("Video processing failed.")
+
+    return video_file
+
+
+def upload_interview_recording(video_file_path):
+    """
+    Upload a recording to Gemini, shrunk to a video proxy and an audio track if enabled.
+
+    Args:
+        video_file_path (str): The path to the recorded video.
+
+    Raises:
+        VideoProcessingError: If Gemini fails to process the recording.
+
+    Returns:
+        list: The processed Gemini files, ready to be used in a prompt.
+    """
+    parts = prepare_recording(video_file_path)
+    if len(parts) == 1:
+        path, mime_type = parts[0]
+        return [upload_interview_video(path, mime_type=mime_type)]
+
+    # Upload the parts side by side so their processing waits overlap
+    with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+        futures = [executor.submit(upload_interview_video, path, mime_type=mime_type) for path, mime_type in parts]
+        return [future.result() for future in futures]
 
 
 # Function to receive feedback from Gemini API on interview performance
-def get_interview_feedback_from_gemini(job_description, video_file_path):
+def get_interview_feedback_from_gemini(job_description, video_file_path, video_files=None, on_text=None,
+                                       structured=False, questions=None):
     """
     This function interacts with the Gemini API to get feedback on interview performance based on a video file.
 
@@ -150,38 +552,354 @@ def get_interview_feedback_from_gemini(job_description, video_file_path):
     Args:
         job_description (str): The job description to base feedback on.
         video_file_path (str): The path to the video file of the interview for analysis.
+        video_files (list, optional): The recording already uploaded by upload_interview_recording.
+            If not given, the file at video_file_path is uploaded first.
+        on_text (callable, optional): Called with the feedback generated so far each time
+            a new chunk streams in from Gemini.
+        structured (bool): Ask for the feedback as JSON sections, see _stream_feedback.
+        questions (list, optional): The questions asked, for per-question feedback in structured mode.
 
     Returns:
-        str: Generated feedback or an error message.
+        str or dict: Generated feedback, its sections in structured mode, or an error message.
     """
     prompt = (f"This is a test interview mp4 for the following role: {job_description}. Please provide feedback on "
               f"body language, communication skills, and the relevance of the answers to the job description. This should be a learning experience."
-              f"Highlight both positive (and not so positive) aspects and areas for improvement, and how the responses could be better."
-              f" Present the feedback in a way that would render well in a HTML <p></p> paragraph, no unnecessary markup, and without any html <p></p> tags.")
+              f"Highlight both positive (and not so positive) aspects and areas for improvement, and how the responses could be better.")
     
     try:
-        # Upload the video file
-        print(f"Uploading file: {video_file_path}...")
-        video_file = genai.upload_file(path=video_file_path)
-        print(f"Upload completed: {video_file.uri}")
-
-        # Check the file's processing state
-        while video_file.state.name == "PROCESSING":
-            print("Processing...", end='', flush=True)
-            time.sleep(10)
-            video_file = genai.get_file(video_file.name)
-
-        if video_file.state.name == "FAILED":
-            raise ValueError("Video processing failed.")
+        if video_files is None:
+            try:
+                video_files = upload_interview_recording(video_file_path)
+            except VideoProcessingError as e:
+                # Gemini could not process the video, so review what was said instead
+                print(f"{e} Falling back to a transcript of the recording.")
+                transcript = transcribe_recording(video_file_path)
+                return get_transcript_feedback_from_gemini(job_description, transcript, on_text=on_text,
+                                                           structured=structured, questions=questions)
+
+        # A shrunk recording comes as a silent video plus its audio track
+        if len(video_files) > 1:
+            prompt += " The audio of the interview is attached as a separate file recorded alongside the video."
 
         # Make the API request for feedback
         print("Requesting feedback..." + prompt)
-        response = model.generate_content([video_file, prompt], request_options={"timeout": 1200})
+        return _stream_feedback([*video_files, prompt], on_text, structured=structured, questions=questions)
+
+    except Exception as e:
+        print(f"Error generating feedback: {e}")
+        return "There was an error when requesting interview feedback. Please try again later."
 
-        # Extract and return the feedback
-        feedback = response.text
+
+def _stream_feedback(contents, on_text=None, timeout=1200, structured=False, questions=None):
+    """
+    Request feedback from Gemini, calling on_text with the feedback generated so far as it streams in.
+
+    The last part of contents is the prompt, without any formatting instructions.
+    Plain feedback is asked for as text that renders well in a HTML paragraph.
+    In structured mode Gemini answers in JSON with the sections in FEEDBACK_SECTIONS.
+    on_text is then called with a dict of the sections completed so far, each time
+    another one is finished, and the validated sections are returned.
+
+    Raises:
+        ValueError: If no valid section could be read from a structured response.
+    """
+    # The prompt is the last part of the request, it is completed with how the feedback should be formatted
+    generation_config = None
+    if structured:
+        contents = [*contents[:-1], contents[-1] + _structured_feedback_instructions(questions)]
+        generation_config = {"response_mime_type": "application/json"}
+    else:
+        contents = [*contents[:-1], f"{contents[-1]} {HTML_PARAGRAPH_INSTRUCTIONS}"]
+
+    response = get_provider('gemini_model').generate_content(
+        contents, stream=True, generation_config=generation_config, request_options={"timeout": timeout}
+    )
+
+    # Collect the feedback as it streams in
+    feedback = ''
+    sections = {}
+    for chunk in response:
+        feedback += chunk.text
+        if not structured:
+            if on_text:
+                on_text(feedback)
+            continue
+
+        completed = _complete_feedback_sections(feedback)
+        if len(completed) > len(sections):
+            sections = completed
+            if on_text:
+                on_text(sections)
+
+    if not structured:
         return feedback
 
+    sections = _complete_feedback_sections(feedback)
+    if not sections:
+        raise ValueError("Structured feedback contained no valid sections.")
+    return sections
+
+
+def _structured_feedback_instructions(questions):
+    """Return the prompt suffix asking for the feedback as JSON sections."""
+    question_list = "\n".join(f"- {question}" for question in questions or [])
+    return (
+        " Respond with a JSON object with exactly these keys, in this "
+        "order: 'body_language' (string), 'communication' (string), 'relevance' (a list of objects with 'question' "
+        "and 'feedback' strings, one for each question answered), 'scores' (an object with integer scores from 1 to 10 "
+        "for 'body_language', 'communication', 'relevance' and 'overall') and 'summary' (string). Write every string as "
+        "plain text without any markup."
+        + (f" The questions asked were:\n{question_list}" if question_list else "")
+    )
+
+
+def _validate_feedback_section(name, value):
+    """
+    Validate one section of a structured feedback response.
+
+    Raises:
+        ValueError: If the section does not match the expected schema.
+
+    Returns:
+        The section, with text stripped and scores clamped to 1-10.
+    """
+    if name in ('body_language', 'communication', 'summary'):
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"'{name}' must be a non-empty string.")
+        return value.strip()
+
+    if name == 'relevance':
+        if not isinstance(value, list) or not all(
+            isinstance(item, dict) and isinstance(item.get('question'), str) and isinstance(item.get('feedback'), str)
+            for item in value
+        ):
+            raise ValueError("'relevance' must be a list of question and feedback strings.")
+        return [{'question': item['question'].strip(), 'feedback': item['feedback'].strip()} for item in value]
+
+    if name == 'scores':
+        if not isinstance(value, dict) or not all(isinstance(value.get(score), (int, float)) for score in SCORE_NAMES):
+            raise ValueError("'scores' must hold a number for each score.")
+        return {score: min(10, max(1, round(value[score]))) for score in SCORE_NAMES}
+
+    raise ValueError(f"Unknown section '{name}'.")
+
+
+def _complete_feedback_sections(response_text):
+    """
+    Read the sections that are complete in a structured feedback response, which may still be streaming.
+
+    The top-level members of the JSON object are decoded one at a time until one
+    is cut off. Invalid sections are left out.
+
+    Args:
+        response_text (str): The response text received so far.
+
+    Returns:
+        dict: The valid, complete sections, in the order they were written.
+    """
+    decoder = json.JSONDecoder()
+    sections = {}
+    text = response_text.strip()
+    if not text.startswith('{'):
+        return sections
+
+    position = 1
+    while True:
+        # Skip the whitespace and comma between members
+        while position < len(text) and text[position] in ' \t\r\n,':
+            position += 1
+        if position >= len(text) or text[position] == '}':
+            return sections
+
+        try:
+            name, position = decoder.raw_decode(text, position)
+            position = text.index(':', position) + 1
+            while position < len(text) and text[position] in ' \t\r\n':
+                position += 1
+            value, position = decoder.raw_decode(text, position)
+        except ValueError:
+            # The rest of the response has not arrived yet
+            return sections
+
+        if name in FEEDBACK_SECTIONS:
+            try:
+                sections[name] = _validate_feedback_section(name, value)
+            except ValueError as e:
+                print(f"Skipping invalid feedback section: {e}")
+
+
+def get_transcript_feedback_from_gemini(job_description, transcript, keyframes=None, on_text=None,
+                                        structured=False, questions=None):
+    """
+    Get feedback on an interview from its transcript and a few still frames, without uploading the video.
+
+    Communication and relevance are judged from the transcript. Body language is
+    judged from the frames, or left out when there are none.
+
+    Args:
+        job_description (str): The job description to base feedback on.
+        transcript (list): (start_seconds, text) tuples, as returned by transcribe_recording.
+        keyframes (list, optional): (seconds, JPEG bytes) tuples sampled from the recording.
+        on_text (callable, optional): Called with the feedback generated so far each time
+            a new chunk streams in from Gemini.
+        structured (bool): Ask for the feedback as JSON sections, see _stream_feedback.
+        questions (list, optional): The questions asked, for per-question feedback in structured mode.
+
+    Returns:
+        str or dict: Generated feedback, its sections in structured mode, or an error message.
+    """
+    if not transcript:
+        return "No speech could be recognised in the recording, so no feedback could be given."
+
+    focus = "body language, communication skills" if keyframes else "communication skills"
+    prompt = (f"This is the timestamped transcript of a test interview for the following role: {job_description}.\n\n"
+              f"{format_transcript(transcript)}\n\n"
+              f"Please provide feedback on {focus}, and the relevance of the answers to the job description. "
+              f"This should be a learning experience. Highlight both positive (and not so positive) aspects and areas "
+              f"for improvement, and how the responses could be better.")
+    if keyframes:
+        prompt += " The images are still frames of the candidate taken during the interview, in order."
+
+    try:
+        print(f"Requesting feedback from a transcript and {len(keyframes or [])} frame(s)...")
+        return _stream_feedback([*pack_keyframes(keyframes or []), prompt], on_text, timeout=ANSWER_FEEDBACK_TIMEOUT,
+                                structured=structured, questions=questions)
     except Exception as e:
         print(f"Error generating feedback: {e}")
         return "There was an error when requesting interview feedback. Please try again later."
+
+
+def get_keyframe_feedback_from_gemini(job_description, video_file_path, on_text=None, keyframes=None,
+                                      structured=False, questions=None):
+    """
+    Get feedback on an interview from its audio track and a few representative frames.
+
+    Body language is judged from the keyframes picked by sample_keyframes rather
+    than from every frame of the video, and communication from the audio.
+
+    Args:
+        job_description (str): The job description to base feedback on.
+        video_file_path (str): The path to the video file of the interview.
+        on_text (callable, optional): Called with the feedback generated so far each time
+            a new chunk streams in from Gemini.
+        keyframes (list, optional): Frames already sampled from the recording.
+        structured (bool): Ask for the feedback as JSON sections, see _stream_feedback.
+        questions (list, optional): The questions asked, for per-question feedback in structured mode.
+
+    Returns:
+        str or dict: Generated feedback, its sections in structured mode, or an error message.
+    """
+    prompt = (f"This is the audio of a test interview for the following role: {job_description}, together with still "
+              f"frames of the candidate picked where their posture or the scene changes. Please provide feedback on "
+              f"body language, communication skills, and the relevance of the answers to the job description. This "
+              f"should be a learning experience. Highlight both positive (and not so positive) aspects and areas for "
+              f"improvement, and how the responses could be better.")
+    try:
+        # Sample the frames while the audio uploads
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            audio_upload = executor.submit(
+                lambda: upload_interview_video(extract_audio_track(video_file_path), mime_type='audio/aac')
+            )
+            if keyframes is None:
+                keyframes = sample_keyframes(video_file_path)
+            audio_file = audio_upload.result()
+
+        print(f"Requesting feedback from the audio and {len(keyframes)} frame(s)...")
+        return _stream_feedback([audio_file, *pack_keyframes(keyframes), prompt], on_text,
+                                structured=structured, questions=questions)
+    except Exception as e:
+        print(f"Error generating feedback: {e}")
+        return "There was an error when requesting interview feedback. Please try again later."
+
+
+def get_answer_feedback_from_gemini(job_description, question, video_files):
+    """
+    Get feedback on the recording of a single answer.
+
+    Args:
+        job_description (str): The job description to base feedback on.
+        question (str): The question being answered.
+        video_files (list): The answer's recording, uploaded by upload_interview_recording.
+
+    Returns:
+        str: The feedback on the answer.
+    """
+    prompt = (f"This is a test interview recording of a single answer to the question \"{question}\" for the following role: "
+              f"{job_description}. Please provide concise feedback on body language, communication skills, and the relevance "
+              f"of the answer to the question and the job description. Highlight both positive (and not so positive) aspects "
+              f"and how the response could be better. {HTML_PARAGRAPH_INSTRUCTIONS}")
+    if len(video_files) > 1:
+        prompt += " The audio of the answer is attached as a separate file recorded alongside the video."
+
+    response = get_provider('gemini_model').generate_content(
+        [*video_files, prompt], request_options={"timeout": ANSWER_FEEDBACK_TIMEOUT}
+    )
+    return response.text
+
+
+def get_segmented_feedback_from_gemini(job_description, video_file_path, answers, on_text=None):
+    """
+    Get feedback on a recording one answer at a time, then summarise it.
+
+    Every answer is cut from the recording, uploaded and reviewed concurrently,
+    so one slow answer does not hold up the others. Reviews are reported through
+    on_text as they finish, then a short text-only request writes the overall summary.
+
+    Args:
+        job_description (str): The job description to base feedback on.
+        video_file_path (str): The path to the video file of the whole interview.
+        answers (list): (question, start_seconds, end_seconds) tuples, one per answer.
+        on_text (callable, optional): Called with the feedback generated so far each time it grows.
+
+    Returns:
+        str: Generated feedback or an error message.
+    """
+    def review_answer(number, question, start, end):
+        segment_path = os.path.splitext(video_file_path)[0] + f'_answer_{number}.mp4'
+        cut_segment(video_file_path, start, end, segment_path)
+        return get_answer_feedback_from_gemini(job_description, question, upload_interview_recording(segment_path))
+
+    reviews = [None] * len(answers)
+    streamed = ''
+    with ThreadPoolExecutor(max_workers=min(MAX_ANSWER_WORKERS, len(answers))) as executor:
+        futures = {
+            executor.submit(review_answer, number, question, start, end): number
+            for number, (question, start, end) in enumerate(answers, start=1)
+        }
+        for future in as_completed(futures):
+            number = futures[future]
+            try:
+                review = future.result()
+            except Exception as e:
+                print(f"Error generating feedback for answer {number}: {e}")
+                continue
+
+            reviews[number - 1] = f"Question {number}: {answers[number - 1][0]}\n{review.strip()}"
+            streamed += reviews[number - 1] + "\n\n"
+            if on_text:
+                on_text(streamed)
+
+    reviews = [review for review in reviews if review]
+    if not reviews:
+        return "There was an error when requesting interview feedback. Please try again later."
+
+    prompt = (f"These are reviews of each answer in a test interview for the following role: {job_description}.\n\n"
+              + "\n\n".join(reviews)
+              + "\n\nPlease write a short overall summary of the candidate's performance and the most important areas "
+                f"for improvement. {HTML_PARAGRAPH_INSTRUCTIONS}")
+    summary = ''
+    try:
+        response = get_provider('gemini_model').generate_content(
+            prompt, stream=True, request_options={"timeout": ANSWER_FEEDBACK_TIMEOUT}
+        )
+        for chunk in response:
+            summary += chunk.text
+            if on_text:
+                on_text(streamed + "Overall: " + summary)
+    except Exception as e:
+        print(f"Error generating feedback summary: {e}")
+
+    feedback = "\n\n".join(reviews)
+    if summary:
+        feedback += "\n\nOverall: " + summary.strip()
+    return feedback
@@ -1,24 +1,124 @@
 import requests
+import random
 import time
 import os
 import json
 import base64
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from clip_cache import clip_key, get_cached_clip, store_clip, link_clip
+from providers import register_provider, get_provider
+from result_store import create_result_store
 
-def generate_video(input_text, video_name, avatar):
+# Base URL for the D-ID API
+BASE_URL = 'https://api.d-id.com'
+
+# Seconds between status checks when D-ID webhooks are not configured
+POLL_INTERVAL = 5
+
+# With webhooks configured, polling is only a fallback for missed deliveries
+WEBHOOK_FALLBACK_POLL_INTERVAL = 30
+
+# Seconds between checks of the result store for a webhook received by another worker process
+WEBHOOK_SIGNAL_INTERVAL = 1
+
+# A webhook signal nobody picked up is forgotten after this many seconds
+WEBHOOK_SIGNAL_TTL = 10 * 60
+
+# Maximum number of clips rendered at the same time
+MAX_RENDER_WORKERS = 4
+
+# Voice style used for every clip
+VOICE_STYLE = 'Cheerful'
+
+# Size of the blocks clips are downloaded in, so memory use does not grow with clip length
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Status codes worth retrying: rate limiting and server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class DIDClient:
     """
-    Generate a video of an avatar speaking the given input text.
+    D-ID API client sharing one pooled, keep-alive HTTP session between calls.
 
-    Args:
-        input_text (str): The text that the avatar will speak.
-        video_name (str): The name of the output video file.
-        avatar (str): The name of the avatar to use ('sophia', 'diana', or 'matt').
+    Requests that hit rate limiting or a server error are retried with jittered
+    exponential backoff. Clip creation is only retried on 429, since a server
+    error may still have created the clip.
+    """
+
+    def __init__(self, api_key, base_url=BASE_URL, webhook_url=None, max_retries=4, backoff=0.5,
+                 pool_size=MAX_RENDER_WORKERS * 2):
+        self.base_url = base_url
+        self.webhook_url = webhook_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        # Encode the API key for the Authorization header
+        auth_string = f'{api_key}:'
+        auth_bytes = auth_string.encode('ascii')
+        auth_base64 = base64.b64encode(auth_bytes).decode('ascii')
+
+        # Headers with correct Authorization format, only sent to the D-ID API
+        self.headers = {
+            'Authorization': f'Basic {auth_base64}',
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
+        }
+
+        # One connection pool per host, sized for the render workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _request(self, method, url, retry_status_codes=RETRY_STATUS_CODES, **kwargs):
+        """Send a request, retrying with jittered backoff on retryable failures."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, timeout=(10, 60), **kwargs)
+            except requests.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in retry_status_codes or attempt == self.max_retries:
+                    return response
+                # Hand the connection back to the pool, a streamed body would otherwise hold it
+                response.close()
+                retry_after = response.headers.get('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    time.sleep(min(int(retry_after), 30))
+                    continue
+
+            # Full jitter: wait a random time up to the exponential backoff
+            time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def create_clip(self, payload):
+        """POST a clip payload to D-ID and return the response."""
+        return self._request('POST', f'{self.base_url}/clips', retry_status_codes={429},
+                             json=payload, headers=self.headers)
+
+    def get_clip(self, clip_id):
+        """Fetch the status of a clip and return the response."""
+        return self._request('GET', f'{self.base_url}/clips/{clip_id}', headers=self.headers)
+
+    def download(self, result_url):
+        """Start a streamed download of a rendered clip and return the response."""
+        return self._request('GET', result_url, stream=True)
+
+
+def create_did_client():
+    """
+    Create the D-ID client. Called on the first render, not at import time.
 
     Raises:
-        ValueError: If the API key is not set or an invalid avatar is chosen.
+        ValueError: If the API key is not set.
 
     Returns:
-        None
+        DIDClient: The client shared by every render.
     """
     # Load environment variables from .env file
     load_dotenv()
@@ -29,36 +129,150 @@ def generate_video(input_text, video_name, avatar):
     if not api_key:
         raise ValueError("DID_API_KEY is not set in the environment.")
 
-    # Base URL for the D-ID API
-    base_url = 'https://api.d-id.com'
+    # DID_API_URL points the client at a different server, such as a local stand-in.
+    # DID_WEBHOOK_URL is the public URL of the app's /did-webhook route.
+    return DIDClient(api_key, base_url=os.getenv("DID_API_URL", BASE_URL),
+                     webhook_url=os.getenv("DID_WEBHOOK_URL"))
 
-    # Encode the API key for the Authorization header
-    auth_string = f'{api_key}:'
-    auth_bytes = auth_string.encode('ascii')
-    auth_base64 = base64.b64encode(auth_bytes).decode('ascii')
 
-    # Headers with correct Authorization format
-    headers = {
-        'Authorization': f'Basic {auth_base64}',
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
+register_provider('did', create_did_client)
+
+# Clips D-ID has reported as finished through the webhook are recorded under clip_done:{clip_id},
+# in a store shared by every worker process, and the condition wakes waiters in this process at once
+_signal_store = create_result_store('memory://')
+_clip_finished = threading.Condition()
+
+
+def use_store(store):
+    """
+    Share webhook signals through a result store, so the worker receiving a webhook wakes any other.
 
+    Args:
+        store: The result store, as returned by create_result_store.
+    """
+    global _signal_store
+    _signal_store = store
+
+
+def notify_clip_finished(clip_id):
+    """
+    Wake the render waiting on a clip. Called by the D-ID webhook route.
+
+    The webhook is only treated as a wake-up signal: the waiter then fetches the
+    clip status from the D-ID API itself, so a forged webhook cannot inject a URL.
+    The waiter may run in another worker process, where it sees the signal within
+    WEBHOOK_SIGNAL_INTERVAL seconds.
+
+    Args:
+        clip_id (str): The ID of the finished clip.
+
+    Returns:
+        bool: False if no clip ID was given.
+    """
+    if not clip_id:
+        return False
+
+    _signal_store.set(f"clip_done:{clip_id}", True, ttl=WEBHOOK_SIGNAL_TTL)
+    with _clip_finished:
+        _clip_finished.notify_all()
+    return True
+
+
+def _wait_for_clip_signal(clip_id, timeout):
+    """Wait up to timeout seconds for the webhook to report a clip as finished, consuming the signal."""
+    signal_key = f"clip_done:{clip_id}"
+    deadline = time.monotonic() + timeout
+    while True:
+        if _signal_store.get(signal_key):
+            _signal_store.delete(signal_key)
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        with _clip_finished:
+            _clip_finished.wait(timeout=min(WEBHOOK_SIGNAL_INTERVAL, remaining))
+
+
+def _get_avatar_config(avatar):
+    """
+    Map an avatar name to its D-ID presenter ID and voice ID.
+
+    Args:
+        avatar (str): The name of the avatar ('sophia', 'diana', or 'matt').
+
+    Raises:
+        ValueError: If an invalid avatar is chosen.
+
+    Returns:
+        tuple: (avatar_id, voice_id)
+    """
     # Convert avatar to lowercase to ensure case-insensitive matching
     avatar_lower = avatar.lower()
 
     if 'sophia' in avatar_lower:
-        avatar_id = 'sophia-ndjDZ_Osqg'
-        voice_id = 'en-US-ElizabethNeural'
+        return 'sophia-ndjDZ_Osqg', 'en-US-ElizabethNeural'
     elif 'diana' in avatar_lower:
-        avatar_id = 'diana-tfTP6K9S9u'
-        voice_id = 'en-US-CoraNeural'
+        return 'diana-tfTP6K9S9u', 'en-US-CoraNeural'
     elif 'matt' in avatar_lower:
-        avatar_id = 'matt-PEvEohn_gk'
-        voice_id = 'en-US-TonyNeural'
+        return 'matt-PEvEohn_gk', 'en-US-TonyNeural'
     else:
         raise ValueError('Invalid avatar chosen')
 
+
+def _video_path(video_name, output_dir=None):
+    """Return the path of a video in output_dir (default 'static/videos'), creating the folder if needed."""
+    if output_dir:
+        videos_dir = output_dir
+    else:
+        # Get the directory of the current script
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+
+        # Define the path to the 'static/videos' folder
+        videos_dir = os.path.join(script_dir, 'static', 'videos')
+
+    # Ensure the output directory exists
+    os.makedirs(videos_dir, exist_ok=True)
+
+    # Define the path for the video file
+    return os.path.join(videos_dir, video_name)
+
+
+def _clip_cache_key(input_text, avatar):
+    """Return the clip cache key for a text spoken by an avatar."""
+    avatar_id, voice_id = _get_avatar_config(avatar)
+    return clip_key(avatar_id, voice_id, input_text, VOICE_STYLE)
+
+
+def _use_cached_clip(input_text, video_name, avatar, output_dir=None):
+    """
+    Serve a clip from the clip cache instead of rendering it.
+
+    Returns:
+        str: The path of the video, or None on a cache miss.
+    """
+    cached_path = get_cached_clip(_clip_cache_key(input_text, avatar))
+    if not cached_path:
+        return None
+
+    video_path = _video_path(video_name, output_dir)
+    link_clip(cached_path, video_path)
+    print(f'Video served from cache as {video_path}')
+    return video_path
+
+
+def create_clip(input_text, avatar):
+    """
+    Submit a clip to D-ID for rendering without waiting for it to finish.
+
+    Args:
+        input_text (str): The text that the avatar will speak.
+        avatar (str): The name of the avatar to use ('sophia', 'diana', or 'matt').
+
+    Returns:
+        str: The D-ID clip ID, or None if the clip could not be created.
+    """
+    avatar_id, voice_id = _get_avatar_config(avatar)
+
     # Payload for creating the clip
     payload = {
         'script': {
@@ -76,66 +290,276 @@ def generate_video(input_text, video_name, avatar):
         'type': 'microsoft',
         'voice_id': voice_id,
         'voice_config': {
-            'style': 'Cheerful'
+            'style': VOICE_STYLE
         }
     }
 
+    # Ask D-ID to call us back when the clip is done
+    client = get_provider('did')
+    if client.webhook_url:
+        payload['webhook'] = client.webhook_url
+
     # Step 1: Create the clip
-    create_clip_url = f'{base_url}/clips'
-    response = requests.post(create_clip_url, json=payload, headers=headers)
+    response = client.create_clip(payload)
+
+    if response.status_code != 201:
+        print('Error initiating clip creation:', response.text)
+        return None
+
+    # Clip creation initiated successfully
+    clip_id = response.json().get('id')
+    if not clip_id:
+        print('Failed to get clip ID from the response.')
+    return clip_id
+
+
+def wait_for_clip(clip_id, poll_interval=None):
+    """
+    Wait until D-ID has finished rendering the clip.
+
+    When a webhook URL is configured, the status is checked as soon as the webhook
+    reports the clip as finished, and polling only runs as a slow fallback.
+
+    Args:
+        clip_id (str): The D-ID clip ID returned by create_clip.
+        poll_interval (int, optional): Seconds to wait between status checks.
+
+    Returns:
+        str: The URL of the rendered video, or None if rendering failed.
+    """
+    client = get_provider('did')
+    if poll_interval is None:
+        poll_interval = WEBHOOK_FALLBACK_POLL_INTERVAL if client.webhook_url else POLL_INTERVAL
+
+    # Step 2: Wait for the webhook or the next poll, then check the clip status
+    while True:
+        _wait_for_clip_signal(clip_id, poll_interval)
+
+        status_response = client.get_clip(clip_id)
+        if status_response.status_code != 200:
+            print('Error checking clip status:', status_response.text)
+            return None
+
+        status_data = status_response.json()
+        status = status_data.get('status')
+
+        if status == 'done':
+            return status_data.get('result_url')
+        elif status == 'error':
+            print('Error generating clip:', status_data.get('error'))
+            return None
 
-    if response.status_code == 201:
-        # Clip creation initiated successfully
-        response_data = response.json()
-        clip_id = response_data.get('id')
+
+def download_clip(result_url, video_name, output_dir=None):
+    """
+    Download a rendered clip into output_dir.
+
+    Args:
+        result_url (str): The URL of the rendered video.
+        video_name (str): The name of the output video file.
+        output_dir (str, optional): The folder to save the video in. Defaults to 'static/videos'.
+
+    Returns:
+        str: The path of the saved video, or None if the download failed.
+    """
+    # Step 3: Download the video
+    video_response = get_provider('did').download(result_url)
+
+    if video_response.status_code != 200:
+        print('Failed to download the video. Status code:', video_response.status_code)
+        video_response.close()
+        return None
+
+    video_path = _video_path(video_name, output_dir)
+
+    # Stream the video into a temporary file next to its final path, then rename it
+    # into place so nobody ever sees a half-written video
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(video_path), suffix='.part')
+    try:
+        with video_response, os.fdopen(fd, 'wb') as video_file:
+            for chunk in video_response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                video_file.write(chunk)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, video_path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+    print(f'Video downloaded and saved successfully as {video_path}')
+    return video_path
+
+
+def generate_video(input_text, video_name, avatar, output_dir=None):
+    """
+    Generate a video of an avatar speaking the given input text.
+
+    Args:
+        input_text (str): The text that the avatar will speak.
+        video_name (str): The name of the output video file.
+        avatar (str): The name of the avatar to use ('sophia', 'diana', or 'matt').
+        output_dir (str, optional): The folder to save the video in. Defaults to 'static/videos'.
+
+    Raises:
+        ValueError: If the API key is not set or an invalid avatar is chosen.
+
+    Returns:
+        str: The path of the saved video, or None if generation failed.
+    """
+    video_path = _use_cached_clip(input_text, video_name, avatar, output_dir)
+    if video_path:
+        return video_path
+
+    clip_id = create_clip(input_text, avatar)
+    if not clip_id:
+        return None
+
+    result_url = wait_for_clip(clip_id)
+    if not result_url:
+        print('Failed to retrieve the video URL.')
+        return None
+
+    video_path = download_clip(result_url, video_name, output_dir)
+    if video_path:
+        store_clip(_clip_cache_key(input_text, avatar), video_path)
+    return video_path
+
+
+class ClipRenderer:
+    """
+    Renders clips concurrently as they are submitted, on a bounded thread pool.
+
+    Each submitted clip is served from the clip cache if possible. Otherwise it is
+    created on D-ID straight away on a pool of its own, so creation never waits
+    behind clips that are still rendering, and is then polled and downloaded on the
+    bounded render pool. Clips can be queued one by one while the rest of the
+    interview is still being written.
+    """
+
+    def __init__(self, avatar, max_workers=MAX_RENDER_WORKERS, on_complete=None, output_dir=None):
+        """
+        Args:
+            avatar (str): The name of the avatar to use ('sophia', 'diana', or 'matt').
+            max_workers (int): The maximum number of clips polled and downloaded at once.
+            on_complete (callable, optional): Called as on_complete(video_name, video_path)
+                each time a clip finishes, successfully or not.
+            output_dir (str, optional): The folder to save the videos in. Defaults to 'static/videos'.
+        """
+        self.avatar = avatar
+        self.on_complete = on_complete
+        self.output_dir = output_dir
+        self.results = {}
+        self._create_executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._outstanding = 0
+        self._done = threading.Condition()
+
+    def submit(self, input_text, video_name):
+        """
+        Queue a clip for rendering.
+
+        Args:
+            input_text (str): The text that the avatar will speak.
+            video_name (str): The name of the output video file.
+
+        Raises:
+            ValueError: If the API key is not set or an invalid avatar is chosen.
+        """
+        with self._done:
+            self.results[video_name] = None
+
+        # Serve previously rendered clips straight from the cache
+        video_path = _use_cached_clip(input_text, video_name, self.avatar, self.output_dir)
+        if video_path:
+            self._finish(video_name, video_path, outstanding=False)
+            return
+
+        # Build the shared client now so a missing API key fails fast
+        get_provider('did')
+
+        with self._done:
+            self._outstanding += 1
+        self._create_executor.submit(self._create, input_text, video_name)
+
+    def _create(self, input_text, video_name):
+        """Create the clip on D-ID, then queue the wait for it on the render pool."""
+        try:
+            clip_id = create_clip(input_text, self.avatar)
+        except Exception as e:
+            print(f'Error submitting {video_name}: {e}')
+            clip_id = None
 
         if clip_id:
-            # Step 2: Poll for the clip status
-            result_url = None
-            status = ''
-            while status != 'done':
-                time.sleep(5)  # Wait for 5 seconds before checking again
-                status_response = requests.get(f'{create_clip_url}/{clip_id}', headers=headers)
-                if status_response.status_code == 200:
-                    status_data = status_response.json()
-                    status = status_data.get('status')
-
-                    if status == 'done':
-                        result_url = status_data.get('result_url')
-                        break
-                    elif status == 'error':
-                        print('Error generating clip:', status_data.get('error'))
-                        break
-                else:
-                    print('Error checking clip status:', status_response.text)
-                    break
+            self._executor.submit(self._render, clip_id, input_text, video_name)
+        else:
+            self._finish(video_name, None)
 
+    def _render(self, clip_id, input_text, video_name):
+        """Wait for a submitted clip, download it and add it to the cache."""
+        video_path = None
+        try:
+            result_url = wait_for_clip(clip_id)
             if result_url:
-                # Step 3: Download the video
-                video_response = requests.get(result_url)
+                video_path = download_clip(result_url, video_name, self.output_dir)
+            else:
+                print(f'Failed to retrieve the video URL for {video_name}.')
+            if video_path:
+                store_clip(_clip_cache_key(input_text, self.avatar), video_path)
+        except Exception as e:
+            print(f'Error rendering {video_name}: {e}')
+        self._finish(video_name, video_path)
 
-                if video_response.status_code == 200:
-                    # Get the directory of the current script
-                    script_dir = os.path.dirname(os.path.abspath(__file__))
+    def _finish(self, video_name, video_path, outstanding=True):
+        """Record a finished clip and wake wait() once nothing is left in flight."""
+        with self._done:
+            self.results[video_name] = video_path
+        if self.on_complete:
+            self.on_complete(video_name, video_path)
+        if outstanding:
+            with self._done:
+                self._outstanding -= 1
+                self._done.notify_all()
 
-                    # Define the path to the 'static/videos' folder
-                    videos_dir = os.path.join(script_dir, 'static', 'videos')
+    def wait(self):
+        """
+        Wait for every submitted clip to finish and shut the pool down.
 
-                    # Ensure the 'static/videos' directory exists
-                    os.makedirs(videos_dir, exist_ok=True)
+        Returns:
+            dict: A mapping of video_name to the saved video path (None on failure).
+        """
+        with self._done:
+            self._done.wait_for(lambda: self._outstanding == 0)
+        self._create_executor.shutdown()
+        self._executor.shutdown()
+        return self.results
 
-                    # Define the path for the video file
-                    video_path = os.path.join(videos_dir, video_name)
 
-                    # Save the video to the specified path
-                    with open(video_path, 'wb') as video_file:
-                        video_file.write(video_response.content)
-                    print(f'Video downloaded and saved successfully as {video_path}')
-                else:
-                    print('Failed to download the video. Status code:', video_response.status_code)
-            else:
-                print('Failed to retrieve the video URL.')
-        else:
-            print('Failed to get clip ID from the response.')
-    else:
-        print('Error initiating clip creation:', response.text)
+def generate_videos(clips, avatar, max_workers=MAX_RENDER_WORKERS, on_complete=None, output_dir=None):
+    """
+    Generate several avatar videos concurrently.
+
+    Clips already in the clip cache are served without contacting D-ID. The rest
+    are submitted to D-ID up front and then polled in parallel, so the total
+    wall-clock time is close to that of the slowest single clip rather than the
+    sum of all of them.
+
+    Args:
+        clips (list): A list of (input_text, video_name) tuples.
+        avatar (str): The name of the avatar to use ('sophia', 'diana', or 'matt').
+        max_workers (int): The maximum number of clips in flight at once.
+        on_complete (callable, optional): Called as on_complete(video_name, video_path)
+            each time a clip finishes, successfully or not.
+        output_dir (str, optional): The folder to save the videos in. Defaults to 'static/videos'.
+
+    Raises:
+        ValueError: If the API key is not set or an invalid avatar is chosen.
+
+    Returns:
+        dict: A mapping of video_name to the saved video path (None on failure).
+    """
+    renderer = ClipRenderer(avatar, max_workers, on_complete, output_dir)
+    try:
+        for input_text, video_name in clips:
+            renderer.submit(input_text, video_name)
+    finally:
+        results = renderer.wait()
+    return results
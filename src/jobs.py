@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+
+from result_store import create_result_store
+
+# Job states, in the order a job normally moves through them
+QUEUED = 'queued'
+SCRAPING = 'scraping'
+SCRIPTING = 'scripting'
+RENDERING = 'rendering'
+DONE = 'done'
+FAILED = 'failed'
+
+# Jobs are forgotten this many seconds after their last update
+JOB_TTL = 60 * 60
+
+# Jobs are kept in the result store, so any worker process can report on them
+_store = create_result_store('memory://')
+_jobs_lock = threading.Lock()
+
+
+def use_store(store):
+    """
+    Keep jobs in a result store shared by every worker process.
+
+    Args:
+        store: The result store, as returned by create_result_store.
+    """
+    global _store
+    _store = store
+
+
+def create_job():
+    """
+    Register a new background job.
+
+    Returns:
+        str: The ID of the new job.
+    """
+    job_id = str(uuid.uuid4())
+    _store.set(f"job:{job_id}", {
+        'id': job_id,
+        'state': QUEUED,
+        'message': 'Waiting to start...',
+        'clips_done': 0,
+        'clips_total': 0,
+        'error': None,
+        'updated_at': time.time(),
+    }, ttl=JOB_TTL)
+    return job_id
+
+
+def update_job(job_id, **fields):
+    """
+    Update the fields of a job.
+
+    Only the worker running a job updates it, so the lock only has to cover its threads.
+
+    Args:
+        job_id (str): The ID of the job to update.
+        **fields: The job fields to overwrite (e.g. state, message, clips_done).
+    """
+    with _jobs_lock:
+        job = _store.get(f"job:{job_id}")
+        if job is None:
+            return
+        job.update(fields)
+        job['updated_at'] = time.time()
+        _store.set(f"job:{job_id}", job, ttl=JOB_TTL)
+
+
+def get_job(job_id):
+    """
+    Return a snapshot of a job.
+
+    Args:
+        job_id (str): The ID of the job.
+
+    Returns:
+        dict: A copy of the job record, or None if the job is unknown.
+    """
+    if not job_id:
+        return None
+    return _store.get(f"job:{job_id}")
+
+
+def start_job(job_id, target, *args):
+    """
+    Run target(job_id, *args) on a background thread.
+
+    Any exception raised by target marks the job as failed.
+
+    Args:
+        job_id (str): The ID of the job.
+        target (callable): The function doing the work.
+        *args: Extra positional arguments passed to target.
+    """
+    def run():
+        try:
+            target(job_id, *args)
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            update_job(job_id, state=FAILED, message='Something went wrong.', error=str(e))
+
+    threading.Thread(target=run, daemon=True).start()
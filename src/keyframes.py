@@ -0,0 +1,208 @@
+import os
+
+# How frames are picked: 'motion' keeps the frames where the picture changes, 'interval' samples at a fixed rate
+KEYFRAME_MODE = os.getenv('KEYFRAME_MODE', 'motion')
+
+# One frame is kept every this many seconds of the recording in 'interval' mode
+KEYFRAME_INTERVAL = float(os.getenv('KEYFRAME_INTERVAL', 10))
+
+# Upper limit on the frames sent with a feedback request
+MAX_KEYFRAMES = int(os.getenv('MAX_KEYFRAMES', 12))
+
+# Frames are analysed at this rate in 'motion' mode, decoding every frame would add nothing
+ANALYSIS_FPS = 4
+
+# Mean absolute difference, out of 255, between thumbnails that counts as a change of scene or posture
+MOTION_THRESHOLD = 12
+
+# A frame is kept at least this often in 'motion' mode, even if nothing moves
+MAX_KEYFRAME_GAP = 30
+
+# Frames are fitted into this box, the largest size Gemini bills as a single image tile
+KEYFRAME_SIZE = 384
+JPEG_QUALITY = 80
+
+# Size of the grayscale thumbnails compared to detect motion
+_THUMBNAIL_SIZE = (64, 36)
+
+
+def keyframe_feedback_enabled():
+    """Return True if body language should be judged from keyframes instead of the full video."""
+    return os.getenv('KEYFRAME_FEEDBACK') == '1'
+
+
+def sample_keyframes(video_path, mode=None, interval=KEYFRAME_INTERVAL, max_frames=MAX_KEYFRAMES,
+                     max_size=KEYFRAME_SIZE):
+    """
+    Pick a small set of representative frames from a recording and encode them as JPEG.
+
+    In 'motion' mode the recording is analysed at ANALYSIS_FPS and a frame is kept
+    whenever it differs enough from the last kept one, or MAX_KEYFRAME_GAP seconds
+    have passed. If that yields more than max_frames, the biggest changes are kept.
+    In 'interval' mode a frame is kept every interval seconds, widened if needed
+    so that max_frames still span the whole recording.
+
+    Args:
+        video_path (str): The path of the recording.
+        mode (str, optional): 'motion' or 'interval'. Defaults to KEYFRAME_MODE.
+        interval (float): Seconds between two frames in 'interval' mode.
+        max_frames (int): The most frames to return.
+        max_size (int): Frames are downscaled to fit in a max_size square.
+
+    Raises:
+        ValueError: If the mode is unknown or the recording cannot be read.
+
+    Returns:
+        list: (seconds, JPEG bytes) tuples in recording order.
+    """
+    mode = mode or KEYFRAME_MODE
+    if mode == 'motion':
+        return _motion_keyframes(video_path, max_frames, max_size)
+    if mode == 'interval':
+        return _interval_keyframes(video_path, interval, max_frames, max_size)
+    raise ValueError(f"Unknown keyframe mode: {mode}")
+
+
+def read_frames(video_path, step_seconds):
+    """
+    Yield (seconds, frame) for about one frame every step_seconds of a recording.
+
+    Every frame is grabbed but only the yielded ones are decoded. Timestamps fall
+    back to the frame rate for browser recordings that do not report them.
+    Shared by the keyframe sampler and the video proxy.
+
+    Raises:
+        ValueError: If the recording cannot be read.
+    """
+    # OpenCV is only needed when keyframes are requested
+    import cv2
+
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+
+    source_fps = capture.get(cv2.CAP_PROP_FPS)
+    if not 0 < source_fps <= 120:
+        source_fps = 30
+
+    try:
+        frame_index = -1
+        next_frame_seconds = 0
+        while capture.grab():
+            frame_index += 1
+            seconds = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            if seconds <= 0 and frame_index > 0:
+                seconds = frame_index / source_fps
+            if seconds < next_frame_seconds:
+                continue
+
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            # Stay on a fixed grid, so frames written at 1 / step_seconds fps last as long as the recording
+            next_frame_seconds = (seconds // step_seconds + 1) * step_seconds
+            yield seconds, frame
+    finally:
+        capture.release()
+
+
+def _recording_seconds(video_path):
+    """Return the length of a recording in seconds, or None if the container does not report it."""
+    import cv2
+
+    capture = cv2.VideoCapture(video_path)
+    try:
+        source_fps = capture.get(cv2.CAP_PROP_FPS)
+        frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+    finally:
+        capture.release()
+
+    if 0 < source_fps <= 120 and frame_count > 0:
+        return frame_count / source_fps
+    return None
+
+
+def _interval_keyframes(video_path, interval, max_frames, max_size):
+    """Return up to max_frames (seconds, JPEG bytes) tuples sampled at a fixed interval."""
+    duration = _recording_seconds(video_path)
+    if duration:
+        interval = max(interval, duration / max_frames)
+
+    frames = []
+    for seconds, frame in read_frames(video_path, interval):
+        frames.append((seconds, encode_jpeg(frame, max_size)))
+        if len(frames) >= max_frames:
+            break
+    return frames
+
+
+def _motion_keyframes(video_path, max_frames, max_size):
+    """Return up to max_frames (seconds, JPEG bytes) tuples where the picture changes the most."""
+    import cv2
+
+    candidates = []
+    last_thumbnail = None
+    last_kept_seconds = None
+    for seconds, frame in read_frames(video_path, 1 / ANALYSIS_FPS):
+        thumbnail = cv2.cvtColor(cv2.resize(frame, _THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA),
+                                 cv2.COLOR_BGR2GRAY)
+        if last_thumbnail is None:
+            # The first frame always shows the candidate settling in
+            change = float('inf')
+        else:
+            change = float(cv2.absdiff(thumbnail, last_thumbnail).mean())
+
+        if change >= MOTION_THRESHOLD or seconds - last_kept_seconds >= MAX_KEYFRAME_GAP:
+            # Candidates are kept encoded, so a long recording does not hold many full frames in memory
+            candidates.append((change, seconds, encode_jpeg(frame, max_size)))
+            last_thumbnail = thumbnail
+            last_kept_seconds = seconds
+
+    # Keep the biggest changes, in recording order
+    if len(candidates) > max_frames:
+        candidates = sorted(sorted(candidates, key=lambda c: c[0], reverse=True)[:max_frames], key=lambda c: c[1])
+    return [(seconds, image) for _, seconds, image in candidates]
+
+
+def encode_jpeg(frame, max_size=KEYFRAME_SIZE):
+    """
+    Downscale a frame to fit in a max_size square and encode it as JPEG.
+
+    Args:
+        frame (numpy.ndarray): The BGR frame read by OpenCV.
+        max_size (int): The longest side of the encoded image.
+
+    Raises:
+        ValueError: If the frame cannot be encoded.
+
+    Returns:
+        bytes: The JPEG image.
+    """
+    import cv2
+
+    height, width = frame.shape[:2]
+    scale = max_size / max(height, width)
+    if scale < 1:
+        frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+
+    ok, image = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not ok:
+        raise ValueError("Could not encode frame as JPEG.")
+    return image.tobytes()
+
+
+def pack_keyframes(keyframes):
+    """
+    Pack keyframes as prompt parts for a Gemini request, each image preceded by its timestamp.
+
+    Args:
+        keyframes (list): (seconds, JPEG bytes) tuples, as returned by sample_keyframes.
+
+    Returns:
+        list: Alternating timestamp strings and inline image parts.
+    """
+    parts = []
+    for seconds, image in keyframes:
+        parts.append(f"Frame at {int(seconds) // 60:02d}:{int(seconds) % 60:02d}:")
+        parts.append({'mime_type': 'image/jpeg', 'data': image})
+    return parts
@@ -0,0 +1,53 @@
+import threading
+
+_factories = {}
+_instances = {}
+_lock = threading.RLock()
+
+
+def register_provider(name, factory):
+    """
+    Register a factory for a lazily built shared object, such as an API client.
+
+    Nothing is built until get_provider is first called for the name. If several
+    modules register the same name, the first registration wins so that they all
+    share one instance.
+
+    Args:
+        name (str): The name of the provider.
+        factory (callable): Called with no arguments to build the object.
+    """
+    with _lock:
+        _factories.setdefault(name, factory)
+
+
+def get_provider(name):
+    """
+    Return the shared object for a provider, building it on first use.
+
+    Args:
+        name (str): The name of the provider.
+
+    Raises:
+        KeyError: If no factory is registered for the name.
+        Exception: Any error raised by the factory. The next call tries again.
+
+    Returns:
+        The object built by the provider's factory.
+    """
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        instance = _instances.get(name)
+        if instance is None:
+            instance = _factories[name]()
+            _instances[name] = instance
+        return instance
+
+
+def reset_provider(name):
+    """Forget the built object for a provider so the next get_provider call rebuilds it."""
+    with _lock:
+        _instances.pop(name, None)
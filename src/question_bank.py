@@ -0,0 +1,165 @@
+import argparse
+import hashlib
+import os
+import re
+from clip_cache import link_clip
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Folder holding the pre-rendered clips, laid out as bank/<avatar>/<complexity>/<key>.mp4
+BANK_DIR = os.path.join(script_dir, 'static', 'videos', 'bank')
+
+AVATARS = ['sophia', 'diana', 'matt']
+
+# Questions asked in many interviews, worth rendering once ahead of time
+COMMON_QUESTIONS = {
+    'beginner': [
+        "Tell me about yourself and why you are a good fit for this job.",
+        "Why do you want to work for our company?",
+        "What are your greatest strengths?",
+        "What is one area you would like to improve in?",
+        "Where do you see yourself in five years?",
+        "Tell me about a time you worked as part of a team.",
+        "Do you have any questions for me?",
+    ],
+    'intermediate': [
+        "Tell me about yourself and why you are a good fit for this job.",
+        "Tell me about a challenge you faced at work and how you overcame it.",
+        "Describe a time you had to learn something new quickly.",
+        "How do you prioritise your work when you have several deadlines?",
+        "Tell me about a time you disagreed with a colleague and how you resolved it.",
+        "What achievement are you most proud of in your career so far?",
+        "Do you have any questions for me?",
+    ],
+    'complex': [
+        "Tell me about yourself and why you are a good fit for this job.",
+        "Describe a time you had to make a difficult decision with incomplete information.",
+        "Tell me about a project that failed and what you learned from it.",
+        "How have you influenced stakeholders who did not agree with you?",
+        "Describe a time you led a team through a significant change.",
+        "How do you balance short-term delivery against long-term quality?",
+        "Do you have any questions for me?",
+    ],
+}
+
+
+def normalize_question(question):
+    """
+    Normalise a question so that small differences in wording do not prevent a match.
+
+    Numbering, bullet symbols, punctuation, case and extra whitespace are removed.
+
+    Args:
+        question (str): The question text.
+
+    Returns:
+        str: The normalised question.
+    """
+    question = re.sub(r'^\s*(\d+[.)]|[-*•])\s*', '', question)
+    question = re.sub(r'[^\w\s]', '', question.lower())
+    return ' '.join(question.split())
+
+
+def _bank_key(question):
+    """Return the file name stem of a question's bank clip."""
+    return hashlib.sha256(normalize_question(question).encode('utf-8')).hexdigest()[:32]
+
+
+def _bank_path(question, avatar, complexity):
+    """Return the path of a question's bank clip."""
+    return os.path.join(BANK_DIR, avatar.lower(), complexity, f'{_bank_key(question)}.mp4')
+
+
+def find_bank_clip(question, avatar, complexity):
+    """
+    Look up a pre-rendered clip for a question.
+
+    The bank for the requested complexity is searched first, then the others,
+    since the clip only depends on the avatar and the spoken text.
+
+    Args:
+        question (str): The question text.
+        avatar (str): The name of the avatar.
+        complexity (str): The complexity level of the interview.
+
+    Returns:
+        str: The path of the bank clip, or None if the question is not in the bank.
+    """
+    complexities = [complexity] + [c for c in COMMON_QUESTIONS if c != complexity]
+    for bank_complexity in complexities:
+        path = _bank_path(question, avatar, bank_complexity)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def serve_bank_clips(clips, avatar, complexity, output_dir):
+    """
+    Link bank clips into output_dir for the questions that are in the bank.
+
+    Args:
+        clips (list): (input_text, video_name) tuples to render.
+        avatar (str): The name of the avatar.
+        complexity (str): The complexity level of the interview.
+        output_dir (str): The folder the videos should appear in.
+
+    Returns:
+        tuple: (clips still to render, list of video names served from the bank)
+    """
+    remaining = []
+    served = []
+    for input_text, video_name in clips:
+        bank_clip = find_bank_clip(input_text, avatar, complexity)
+        if bank_clip:
+            link_clip(bank_clip, os.path.join(output_dir, video_name))
+            served.append(video_name)
+        else:
+            remaining.append((input_text, video_name))
+
+    if served:
+        print(f"Served {len(served)} clip(s) from the question bank.")
+    return remaining, served
+
+
+def build_bank(avatars=AVATARS, complexities=None, max_workers=None):
+    """
+    Render every common question that is missing from the bank.
+
+    Args:
+        avatars (list): The avatars to render for.
+        complexities (list, optional): The complexity levels to render. Defaults to all.
+        max_workers (int, optional): The maximum number of clips rendered at once.
+    """
+    # Only the build command needs the D-ID client
+    from generate_avatar import generate_videos, MAX_RENDER_WORKERS
+
+    for avatar in avatars:
+        for complexity in complexities or COMMON_QUESTIONS:
+            output_dir = os.path.join(BANK_DIR, avatar, complexity)
+            clips = [
+                (question, f'{_bank_key(question)}.mp4')
+                for question in COMMON_QUESTIONS[complexity]
+                if not os.path.exists(_bank_path(question, avatar, complexity))
+            ]
+            if not clips:
+                print(f"{avatar}/{complexity}: bank is complete.")
+                continue
+
+            print(f"{avatar}/{complexity}: rendering {len(clips)} clip(s)...")
+            results = generate_videos(clips, avatar, max_workers=max_workers or MAX_RENDER_WORKERS,
+                                      output_dir=output_dir)
+            failed = [video_name for video_name, video_path in results.items() if not video_path]
+            if failed:
+                print(f"{avatar}/{complexity}: {len(failed)} clip(s) failed to render.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pre-render common interview questions for each avatar.")
+    parser.add_argument('--avatar', choices=AVATARS, action='append', help='avatar to render for (default: all)')
+    parser.add_argument('--complexity', choices=list(COMMON_QUESTIONS), action='append',
+                        help='complexity level to render (default: all)')
+    parser.add_argument('--workers', type=int, help='maximum number of clips rendered at once')
+    args = parser.parse_args()
+
+    build_bank(args.avatar or AVATARS, args.complexity, args.workers)
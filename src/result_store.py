@@ -0,0 +1,322 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+# Results expire after this many seconds unless a different TTL is given
+DEFAULT_TTL = 24 * 60 * 60
+
+# The oldest results are evicted once the store holds more than this many entries
+DEFAULT_MAX_ENTRIES = 10000
+
+# A claim that is never released expires after this many seconds
+DEFAULT_CLAIM_TTL = 30 * 60
+
+
+class SQLiteResultStore:
+    """
+    Result store backed by a SQLite database in WAL mode.
+
+    The database file can be shared by every worker process on the machine. Values
+    are stored as JSON, expire after a TTL, and the oldest entries are evicted once
+    the store grows past max_entries.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_updated_at ON results (updated_at)")
+
+    def _connect(self):
+        """Return this thread's connection to the database."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """
+        Return the value stored under key.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            The stored value, or None if it is missing or expired.
+        """
+        row = self._connect().execute(
+            "SELECT value FROM results WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a JSON-serialisable value under key.
+
+        Args:
+            key (str): The key to store the value under.
+            value: The value to store.
+            ttl (int, optional): Seconds until the value expires. Defaults to the store's TTL.
+        """
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now)
+            )
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def claim(self, key, ttl=DEFAULT_CLAIM_TTL):
+        """
+        Atomically claim key so that only one worker processes it.
+
+        Args:
+            key (str): The key to claim.
+            ttl (int): Seconds until an unreleased claim expires.
+
+        Returns:
+            bool: True if this caller now owns the claim, False if another worker holds it.
+        """
+        now = time.time()
+        claim_key = f"claim:{key}"
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM results WHERE key = ? AND expires_at <= ?", (claim_key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO results (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                (claim_key, json.dumps(os.getpid()), now + ttl, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def release(self, key):
+        """Release a claim taken with claim()."""
+        self.delete(f"claim:{key}")
+
+    def delete(self, key):
+        """Remove the value stored under key."""
+        self._connect().execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def _evict(self, conn, now):
+        """
+        Drop expired entries and the oldest entries beyond max_entries.
+
+        Claims are left to expire on their own. Evicting one would let a second
+        worker start the same job, so they do not count towards max_entries.
+        """
+        conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        count = conn.execute("SELECT COUNT(*) FROM results WHERE key NOT LIKE 'claim:%'").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results WHERE key NOT LIKE 'claim:%' ORDER BY updated_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+
+class LocalRedis:
+    """
+    In-process stand-in for the subset of the Redis client used by RedisResultStore.
+
+    Useful for development and single-process deployments without a Redis server.
+    Once it holds more than max_entries values, the least recently set ones are
+    dropped. Values set with nx, which is how claims are taken, are kept apart
+    and only expire.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._claims = {}
+        self._lock = threading.Lock()
+
+    def _live_item(self, name, now):
+        """Return the (value, expires_at) stored under name, dropping it if expired. Caller must hold the lock."""
+        for data in (self._claims, self._data):
+            item = data.get(name)
+            if item is not None:
+                if item[1] is not None and item[1] <= now:
+                    del data[name]
+                    return None
+                return item
+        return None
+
+    def get(self, name):
+        """
+        Return the value stored under name.
+
+        Args:
+            name (str): The key to look up.
+
+        Returns:
+            The stored value, or None if it is missing or expired.
+        """
+        with self._lock:
+            item = self._live_item(name, time.time())
+            return item[0] if item else None
+
+    def set(self, name, value, ex=None, nx=False):
+        """
+        Store a value under name.
+
+        Args:
+            name (str): The key to store the value under.
+            value: The value to store.
+            ex (int, optional): Seconds until the value expires. Never expires if not given.
+            nx (bool): Only store the value if name holds no live value yet.
+
+        Returns:
+            bool: True if the value was stored, None if nx was given and name was taken.
+        """
+        with self._lock:
+            now = time.time()
+            if nx and self._live_item(name, now) is not None:
+                return None
+            item = (value, now + ex if ex else None)
+            self._claims.pop(name, None)
+            self._data.pop(name, None)
+            if nx:
+                self._claims[name] = item
+                return True
+            self._data[name] = item
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, *names):
+        """
+        Remove the values stored under names.
+
+        Returns:
+            int: The number of values removed.
+        """
+        with self._lock:
+            return sum(
+                1 for name in names
+                if self._data.pop(name, None) is not None or self._claims.pop(name, None) is not None
+            )
+
+
+class RedisResultStore:
+    """
+    Result store backed by Redis or any client with the same get/set/delete interface.
+
+    Redis handles expiry itself, and its maxmemory policy takes the place of the size cap.
+    """
+
+    def __init__(self, client, ttl=DEFAULT_TTL, prefix='interview_tool:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        """
+        Return the value stored under key.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            The stored value, or None if it is missing or expired.
+        """
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a JSON-serialisable value under key.
+
+        Args:
+            key (str): The key to store the value under.
+            value: The value to store.
+            ttl (int, optional): Seconds until the value expires. Defaults to the store's TTL.
+        """
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl if ttl is not None else self.ttl)
+
+    def claim(self, key, ttl=DEFAULT_CLAIM_TTL):
+        """
+        Atomically claim key so that only one worker processes it.
+
+        Args:
+            key (str): The key to claim.
+            ttl (int): Seconds until an unreleased claim expires.
+
+        Returns:
+            bool: True if this caller now owns the claim, False if another worker holds it.
+        """
+        return bool(self.client.set(f"{self.prefix}claim:{key}", json.dumps(os.getpid()), ex=ttl, nx=True))
+
+    def release(self, key):
+        """Release a claim taken with claim()."""
+        self.delete(f"claim:{key}")
+
+    def delete(self, key):
+        """Remove the value stored under key."""
+        self.client.delete(self.prefix + key)
+
+
+def create_result_store(url):
+    """
+    Create a result store from a URL.
+
+    Supported URLs:
+        sqlite:///path/to/results.db  SQLite database file (the default).
+        redis://host:port/db          Redis server, requires the 'redis' package.
+        memory://                     In-process LocalRedis stand-in.
+
+    Args:
+        url (str): The URL describing the store.
+
+    Raises:
+        ValueError: If the URL scheme is not supported.
+
+    Returns:
+        The result store.
+    """
+    parsed_url = urlparse(url)
+
+    if parsed_url.scheme == 'sqlite':
+        return SQLiteResultStore(url[len('sqlite:///'):])
+    elif parsed_url.scheme in ('redis', 'rediss'):
+        import redis
+        return RedisResultStore(redis.Redis.from_url(url))
+    elif parsed_url.scheme == 'memory':
+        return RedisResultStore(LocalRedis())
+    else:
+        raise ValueError(f"Unsupported result store URL: {url}")
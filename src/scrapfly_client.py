@@ -0,0 +1,34 @@
+import os
+from dotenv import load_dotenv
+from providers import register_provider, get_provider
+
+
+def create_scrapfly_client():
+    """
+    Create the Scrapfly client. Called on the first scrape, not at import time.
+
+    Raises:
+        ValueError: If the Scrapfly API key is not set.
+
+    Returns:
+        ScrapflyClient: The client shared by every job site scraper.
+    """
+    from scrapfly import ScrapflyClient
+
+    # Load environment variables from .env file
+    load_dotenv()
+    scrapfly_api_key = os.getenv("SCRAPFLY_API_KEY")
+
+    if not scrapfly_api_key:
+        raise ValueError("SCRAPFLY_API_KEY is not set in the environment.")
+
+    # Initialize the Scrapfly client with your API key
+    return ScrapflyClient(key=scrapfly_api_key)
+
+
+register_provider('scrapfly', create_scrapfly_client)
+
+
+def get_scrapfly_client():
+    """Return the Scrapfly client shared by every job site scraper, building it on first use."""
+    return get_provider('scrapfly')
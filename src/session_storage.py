@@ -0,0 +1,66 @@
+import os
+import shutil
+import threading
+import time
+
+# Session folders untouched for longer than this many seconds are deleted
+SESSION_TTL = int(os.getenv('SESSION_TTL', 6 * 60 * 60))
+
+# How often the garbage collector looks for expired sessions, in seconds
+GC_INTERVAL = 10 * 60
+
+
+def session_dir(root, session_id):
+    """
+    Return the folder holding one session's files, creating it if needed.
+
+    Args:
+        root (str): The folder containing all session folders.
+        session_id (str): The ID of the session.
+
+    Returns:
+        str: The path of the session folder.
+    """
+    path = os.path.join(root, session_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def remove_expired_sessions(root, ttl=SESSION_TTL):
+    """
+    Delete the session folders under root that have not been modified within ttl seconds.
+
+    Args:
+        root (str): The folder containing all session folders.
+        ttl (int): The maximum age of a session folder, in seconds.
+    """
+    if not os.path.isdir(root):
+        return
+
+    cutoff = time.time() - ttl
+    with os.scandir(root) as it:
+        for entry in it:
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry.path)
+                    print(f"Removed expired session folder {entry.path}")
+            except OSError as e:
+                print(f"Error removing session folder {entry.path}: {e}")
+
+
+def start_session_gc(roots, ttl=SESSION_TTL, interval=GC_INTERVAL):
+    """
+    Periodically remove expired session folders on a background thread.
+
+    Args:
+        roots (list): The folders containing session folders.
+        ttl (int): The maximum age of a session folder, in seconds.
+        interval (int): Seconds to wait between collections.
+    """
+    def collect():
+        while True:
+            for root in roots:
+                remove_expired_sessions(root, ttl)
+            time.sleep(interval)
+
+    threading.Thread(target=collect, daemon=True).start()
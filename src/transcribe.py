@@ -0,0 +1,75 @@
+import os
+from video_proxy import extract_audio_track
+
+# Speech recognition engines that run locally, without sending the audio anywhere
+OFFLINE_ENGINES = ('sphinx', 'whisper')
+
+# The audio is transcribed in chunks of this many seconds, each with its own timestamp
+CHUNK_SECONDS = 15
+
+
+def transcription_enabled():
+    """Return True if recordings should be transcribed locally instead of uploaded as video."""
+    return os.getenv('TRANSCRIBE') == '1'
+
+
+def transcribe_recording(video_path, engine=None, chunk_seconds=CHUNK_SECONDS):
+    """
+    Transcribe the speech in a recording offline.
+
+    The audio is extracted with ffmpeg and read with SpeechRecognition, one
+    chunk at a time, so each line of the transcript carries the time it starts at.
+
+    Args:
+        video_path (str): The path of the recording.
+        engine (str, optional): 'sphinx' (needs pocketsphinx) or 'whisper' (needs openai-whisper).
+            Defaults to the TRANSCRIBE_ENGINE environment variable, or 'sphinx'.
+        chunk_seconds (float): The length of each transcribed chunk.
+
+    Raises:
+        ValueError: If the engine does not run offline.
+        RuntimeError: If ffmpeg is not installed.
+
+    Returns:
+        list: (start_seconds, text) tuples for the chunks in which speech was recognised.
+    """
+    # SpeechRecognition is only needed when transcription is enabled
+    import speech_recognition as sr
+
+    engine = engine or os.getenv('TRANSCRIBE_ENGINE', 'sphinx')
+    if engine not in OFFLINE_ENGINES:
+        raise ValueError(f"Unsupported offline speech recognition engine: {engine}")
+
+    recognizer = sr.Recognizer()
+    recognize = getattr(recognizer, f'recognize_{engine}')
+    wav_path = extract_audio_track(video_path, os.path.splitext(video_path)[0] + '_audio.wav')
+
+    transcript = []
+    with sr.AudioFile(wav_path) as source:
+        offset = 0
+        while offset < source.DURATION:
+            # Each call reads on from where the previous one stopped
+            audio = recognizer.record(source, duration=chunk_seconds)
+            try:
+                text = recognize(audio).strip()
+            except sr.UnknownValueError:
+                text = ''
+            if text:
+                transcript.append((offset, text))
+            offset += chunk_seconds
+
+    print(f"Transcribed {len(transcript)} chunk(s) of speech.")
+    return transcript
+
+
+def format_transcript(transcript):
+    """
+    Format a transcript with one [mm:ss] timestamped line per chunk.
+
+    Args:
+        transcript (list): (start_seconds, text) tuples, as returned by transcribe_recording.
+
+    Returns:
+        str: The formatted transcript.
+    """
+    return "\n".join(f"[{int(start) // 60:02d}:{int(start) % 60:02d}] {text}" for start, text in transcript)
@@ -0,0 +1,209 @@
+import os
+import shutil
+import subprocess
+from keyframes import read_frames
+
+# Gemini samples video at one frame per second, so the proxy keeps no more than that
+PROXY_FPS = 1
+
+# Frames are downscaled to this height, keeping the aspect ratio
+PROXY_HEIGHT = 360
+
+# The audio track is mono speech, so a low bitrate is enough
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_BITRATE = '32k'
+
+# Longest time the audio extraction or cutting one answer may take, in seconds
+AUDIO_TIMEOUT = 120
+SEGMENT_TIMEOUT = 120
+
+# Answers shorter than this many seconds are skipped
+MIN_SEGMENT_SECONDS = 1
+
+
+def proxy_enabled():
+    """Return True if recordings should be shrunk before they are uploaded to Gemini."""
+    return os.getenv('VIDEO_PROXY') == '1'
+
+
+def _sibling_path(video_path, suffix):
+    """Return a path next to video_path with its extension replaced by suffix."""
+    return os.path.splitext(video_path)[0] + suffix
+
+
+def _ffmpeg():
+    """Return the path of ffmpeg, raising RuntimeError if it is not installed."""
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg is required to process the recording's audio.")
+    return ffmpeg
+
+
+def can_split_recording():
+    """Return True if recordings can be cut into one clip per answer."""
+    return shutil.which('ffmpeg') is not None
+
+
+def make_video_proxy(video_path, output_path=None, fps=PROXY_FPS, max_height=PROXY_HEIGHT):
+    """
+    Write a low frame rate, downscaled copy of a recording, without its audio.
+
+    Frames are picked by their timestamp, so the proxy lasts as long as the
+    recording even when the browser's WebM reports no usable frame rate.
+
+    Args:
+        video_path (str): The path of the recording.
+        output_path (str, optional): Where to write the proxy. Defaults to <name>_proxy.mp4.
+        fps (float): The frame rate of the proxy.
+        max_height (int): Frames taller than this are downscaled to it.
+
+    Raises:
+        ValueError: If the recording cannot be read.
+
+    Returns:
+        str: The path of the proxy video.
+    """
+    # OpenCV is only needed when proxies are enabled
+    import cv2
+
+    output_path = output_path or _sibling_path(video_path, '_proxy.mp4')
+    writer = None
+    try:
+        for _, frame in read_frames(video_path, 1 / fps):
+            height, width = frame.shape[:2]
+            if height > max_height:
+                # Codecs expect even dimensions
+                width = max(2, round(width * max_height / height / 2) * 2)
+                frame = cv2.resize(frame, (width, max_height), interpolation=cv2.INTER_AREA)
+
+            if writer is None:
+                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                writer = cv2.VideoWriter(output_path, fourcc, fps, (frame.shape[1], frame.shape[0]))
+            writer.write(frame)
+    finally:
+        if writer is not None:
+            writer.release()
+
+    if writer is None:
+        raise ValueError(f"No frames could be read from video: {video_path}")
+
+    return output_path
+
+
+def extract_audio_track(video_path, output_path=None):
+    """
+    Write the audio of a recording as a mono track.
+
+    The track is low bitrate AAC, or 16-bit PCM when output_path ends in .wav,
+    which is what speech recognition reads. OpenCV does not read audio, so this
+    step needs ffmpeg on the PATH.
+
+    Args:
+        video_path (str): The path of the recording.
+        output_path (str, optional): Where to write the audio. Defaults to <name>_audio.aac.
+
+    Raises:
+        RuntimeError: If ffmpeg is not installed.
+        subprocess.CalledProcessError: If ffmpeg fails.
+
+    Returns:
+        str: The path of the audio file.
+    """
+    output_path = output_path or _sibling_path(video_path, '_audio.aac')
+    if output_path.endswith('.wav'):
+        encoding = ['-c:a', 'pcm_s16le', '-f', 'wav']
+    else:
+        encoding = ['-c:a', 'aac', '-b:a', AUDIO_BITRATE, '-f', 'adts']
+
+    subprocess.run(
+        [_ffmpeg(), '-y', '-loglevel', 'error', '-i', video_path, '-vn',
+         '-ac', '1', '-ar', str(AUDIO_SAMPLE_RATE), *encoding, output_path],
+        check=True, timeout=AUDIO_TIMEOUT,
+    )
+    return output_path
+
+
+def answer_segments(question_marks):
+    """
+    Turn the times at which each question was shown into one time range per answer.
+
+    Consecutive marks for the same question are merged, and answers shorter than
+    MIN_SEGMENT_SECONDS are dropped.
+
+    Args:
+        question_marks (list): (question_index, start_seconds) tuples, in recording order.
+
+    Returns:
+        list: (question_index, start_seconds, end_seconds) tuples. The last end is None,
+            meaning the end of the recording.
+    """
+    merged = []
+    for question_index, start in question_marks:
+        if not merged or merged[-1][0] != question_index:
+            merged.append((question_index, start))
+
+    segments = []
+    for position, (question_index, start) in enumerate(merged):
+        end = merged[position + 1][1] if position + 1 < len(merged) else None
+        if end is None or end - start >= MIN_SEGMENT_SECONDS:
+            segments.append((question_index, start, end))
+    return segments
+
+
+def cut_segment(video_path, start, end, output_path):
+    """
+    Write one answer of a recording as its own MP4 clip.
+
+    The clip is re-encoded rather than copied, because browser recordings have
+    few keyframes to cut on.
+
+    Args:
+        video_path (str): The path of the recording.
+        start (float): Where the answer starts, in seconds.
+        end (float): Where the answer ends, in seconds, or None for the end of the recording.
+        output_path (str): Where to write the clip.
+
+    Raises:
+        RuntimeError: If ffmpeg is not installed.
+        subprocess.CalledProcessError: If ffmpeg fails.
+
+    Returns:
+        str: The path of the clip.
+    """
+    command = [_ffmpeg(), '-y', '-loglevel', 'error', '-ss', f'{start:.3f}', '-i', video_path]
+    if end is not None:
+        command += ['-t', f'{end - start:.3f}']
+    command += ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28',
+                '-c:a', 'aac', '-b:a', AUDIO_BITRATE, output_path]
+    subprocess.run(command, check=True, timeout=SEGMENT_TIMEOUT)
+    return output_path
+
+
+def prepare_recording(video_path):
+    """
+    Return the files to upload to Gemini for a recording.
+
+    When proxies are enabled, the recording is replaced by a downscaled, low
+    frame rate video and a separate audio track. If either cannot be made, the
+    original recording is uploaded as it is.
+
+    Args:
+        video_path (str): The path of the recording.
+
+    Returns:
+        list: (path, mime_type) tuples to upload. mime_type is None when it can be guessed from the path.
+    """
+    if not proxy_enabled():
+        return [(video_path, None)]
+
+    try:
+        proxy_path = make_video_proxy(video_path)
+        audio_path = extract_audio_track(video_path)
+    except Exception as e:
+        print(f"Could not shrink the recording, uploading the original: {e}")
+        return [(video_path, None)]
+
+    original_size = os.path.getsize(video_path)
+    proxy_size = os.path.getsize(proxy_path) + os.path.getsize(audio_path)
+    print(f"Shrunk recording from {original_size} to {proxy_size} bytes.")
+    return [(proxy_path, 'video/mp4'), (audio_path, 'audio/aac')]
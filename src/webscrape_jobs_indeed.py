@@ -1,20 +1,11 @@
-import os
 import re
 import json
-from dotenv import load_dotenv
-from typing import Dict
-from parsel import Selector
-from scrapfly import ScrapeConfig, ScrapflyClient, ScrapeApiResponse
+from typing import TYPE_CHECKING, Dict
+from scrapfly_client import get_scrapfly_client
 
-# Load environment variables from .env file
-load_dotenv()
-scrapfly_api_key = os.getenv("SCRAPFLY_API_KEY")
+if TYPE_CHECKING:
+    from scrapfly import ScrapeApiResponse
 
-if not scrapfly_api_key:
-    raise ValueError("SCRAPFLY_API_KEY is not set in the environment.")
-
-# Initialize the Scrapfly client with your API key
-client = ScrapflyClient(key=scrapfly_api_key)
 
 # Base configuration for Scrapfly
 BASE_CONFIG = {
@@ -24,7 +15,7 @@ BASE_CONFIG = {
     }
 }
 
-def parse_job_page(response: ScrapeApiResponse) -> Dict[str, str]:
+def parse_job_page(response: "ScrapeApiResponse") -> Dict[str, str]:
     """
     Parse the job title and description from the Indeed job page response.
 
@@ -34,6 +25,8 @@ def parse_job_page(response: ScrapeApiResponse) -> Dict[str, str]:
     Returns:
         Dict[str, str]: A dictionary containing 'title' and 'description' keys.
     """
+    from parsel import Selector
+
     html_content = response.content
     # Use regex to find the JSON data
     data_match = re.search(r"_initialData=(\{.+?\});", html_content)
@@ -73,6 +66,8 @@ def scrape_job_page(job_id: str) -> Dict[str, str]:
     # Construct the job URL using the job ID
     url = f"https://www.indeed.com/m/basecamp/viewjob?viewtype=embedded&jk={job_id}"
 
+    from scrapfly import ScrapeConfig
+
     # Create the scrape configuration
     scrape_config = ScrapeConfig(
         url=url,
@@ -80,7 +75,7 @@ def scrape_job_page(job_id: str) -> Dict[str, str]:
     )
 
     # Perform the scrape
-    response = client.scrape(scrape_config)
+    response = get_scrapfly_client().scrape(scrape_config)
 
     # Parse the job page
     job_data = parse_job_page(response)
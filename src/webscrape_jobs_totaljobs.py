@@ -1,19 +1,10 @@
-import os
 import json
-from dotenv import load_dotenv
-from typing import Dict, Any
-from parsel import Selector
-from scrapfly import ScrapeConfig, ScrapflyClient, ScrapeApiResponse
+from typing import TYPE_CHECKING, Dict, Any
+from scrapfly_client import get_scrapfly_client
 
-# Load environment variables from .env file
-load_dotenv()
-scrapfly_api_key = os.getenv("SCRAPFLY_API_KEY")
+if TYPE_CHECKING:
+    from scrapfly import ScrapeApiResponse
 
-if not scrapfly_api_key:
-    raise ValueError("SCRAPFLY_API_KEY is not set in the environment.")
-
-# Initialize the Scrapfly client with your API key
-client = ScrapflyClient(key=scrapfly_api_key)
 
 # Base configuration for Scrapfly
 BASE_CONFIG = {
@@ -23,7 +14,7 @@ BASE_CONFIG = {
     }
 }
 
-def parse_job_page(response: ScrapeApiResponse) -> Dict[str, Any]:
+def parse_job_page(response: "ScrapeApiResponse") -> Dict[str, Any]:
     """
     Parse the job title and description from the Totaljobs job page response.
 
@@ -33,6 +24,8 @@ def parse_job_page(response: ScrapeApiResponse) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: A dictionary containing job data.
     """
+    from parsel import Selector
+
     html_content = response.content
     selector = Selector(html_content)
 
@@ -78,6 +71,8 @@ def scrape_job_page(job_id: str) -> Dict[str, Any]:
     # Construct the job URL using the job ID
     url = f"https://www.totaljobs.com/job/{job_id}/"
 
+    from scrapfly import ScrapeConfig
+
     # Create the scrape configuration
     scrape_config = ScrapeConfig(
         url=url,
@@ -85,7 +80,7 @@ def scrape_job_page(job_id: str) -> Dict[str, Any]:
     )
 
     # Perform the scrape
-    response = client.scrape(scrape_config)
+    response = get_scrapfly_client().scrape(scrape_config)
 
     # Parse the job page
     job_data = parse_job_page(response)
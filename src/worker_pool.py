@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when a WorkerPool cannot accept any more jobs."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Worker queue is full, retry in {retry_after} seconds.")
+        self.retry_after = retry_after
+
+
+class WorkerPool:
+    """
+    Fixed-size thread pool with a bounded queue and per-key deduplication.
+
+    At most max_workers jobs run at once and at most max_queue more wait for a
+    free worker. Submitting a key that is already queued or running is a no-op.
+    """
+
+    def __init__(self, max_workers, max_queue, initial_job_seconds=60):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # Moving average of how long a job takes, used to estimate waiting times
+        self._average_job_seconds = initial_job_seconds
+
+    def submit(self, key, fn, *args):
+        """
+        Queue fn(*args) unless a job with the same key is already in flight.
+
+        Args:
+            key (str): Identifies the job for deduplication.
+            fn (callable): The function to run.
+            *args: Positional arguments passed to fn.
+
+        Raises:
+            QueueFullError: If the queue is full.
+
+        Returns:
+            bool: True if the job was queued, False if it was already in flight.
+        """
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            if len(self._in_flight) >= self.max_workers + self.max_queue:
+                raise QueueFullError(self._estimated_wait())
+
+            future = self._executor.submit(self._run, fn, *args)
+            self._in_flight[key] = future
+
+        future.add_done_callback(lambda _: self._forget(key))
+        return True
+
+    def is_in_flight(self, key):
+        """Return True if a job with this key is queued or running."""
+        with self._lock:
+            return key in self._in_flight
+
+    def estimated_wait(self):
+        """Return the estimated seconds until a newly queued job would start."""
+        with self._lock:
+            return self._estimated_wait()
+
+    def _estimated_wait(self):
+        """Estimate the wait for a new job. Caller must hold the lock."""
+        waiting = max(0, len(self._in_flight) - self.max_workers + 1)
+        return int(self._average_job_seconds * waiting / self.max_workers) + 1
+
+    def _run(self, fn, *args):
+        """Run a job and record how long it took."""
+        started_at = time.time()
+        try:
+            return fn(*args)
+        finally:
+            duration = time.time() - started_at
+            with self._lock:
+                self._average_job_seconds = 0.8 * self._average_job_seconds + 0.2 * duration
+
+    def _forget(self, key):
+        """Remove a finished job from the in-flight set."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting jobs and drain the ones already queued.
+
+        Args:
+            wait (bool): Block until every queued and running job has finished.
+        """
+        self._executor.shutdown(wait=wait)